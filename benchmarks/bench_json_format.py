@@ -0,0 +1,91 @@
+"""
+JSON format benchmark
+Compares file size and parse time of the 'records' and 'columnar' per-game outputs.
+
+Parse times are measured with Python's json module and, when node is on the PATH,
+with JSON.parse plus control.js's decodeColumnar, which is what the browser runs.
+
+Usage: python benchmarks/bench_json_format.py --rows 200000
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import server
+from synthetic import write_box_score_csv
+
+# Times JSON.parse (and decodeColumnar for columnar files) over several runs, in ms
+NODE_SCRIPT = """
+const fs = require('fs');
+const src = fs.readFileSync(process.argv[2], 'utf8');
+eval(src.slice(src.indexOf('function decodeColumnar'), src.indexOf('function loadAllData')));
+const text = fs.readFileSync(process.argv[3], 'utf8');
+let best = Infinity;
+for (let i = 0; i < 5; i++) {
+    const start = process.hrtime.bigint();
+    decodeColumnar(JSON.parse(text));
+    best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e6);
+}
+console.log(best);
+"""
+
+
+def python_parse_ms(path, repeat=3):
+    with open(path) as f:
+        text = f.read()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def node_parse_ms(path, script_path):
+    result = subprocess.run(['node', script_path, os.path.join(REPO_DIR, 'control.js'), path],
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000, help='Rows in the synthetic season')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'season.csv')
+        write_box_score_csv(csv_path, args.rows)
+        frame = server.normalize_frame(server.read_season_csv(csv_path))
+        bench_df = frame[['Player', 'Tm', 'PTS', 'MP', 'GmSc']]
+        mvp_df = frame[['Player', 'Date', 'PTS', 'AST', 'TRB', 'GmSc']]
+
+        node_script = None
+        if shutil.which('node'):
+            node_script = os.path.join(tmp_dir, 'parse.js')
+            with open(node_script, 'w') as f:
+                f.write(NODE_SCRIPT)
+
+        print(f"\n{'file':<12} {'format':<9} {'size MB':>8} {'gzip MB':>8} {'py parse ms':>12} {'node ms':>8}")
+        for name, df in [('bench_data', bench_df), ('mvp_data', mvp_df)]:
+            for json_format in ['records', 'columnar']:
+                server.JSON_FORMAT = json_format
+                path = os.path.join(tmp_dir, f'{name}.{json_format}.json')
+                server.write_records(path, df)
+                with open(path, 'rb') as f:
+                    gzip_size = len(gzip.compress(f.read()))
+                node_ms = f"{node_parse_ms(path, node_script):8.1f}" if node_script else f"{'n/a':>8}"
+                print(f"{name:<12} {json_format:<9} {os.path.getsize(path) / 1e6:8.2f} {gzip_size / 1e6:8.2f} "
+                      f"{python_parse_ms(path):12.1f} {node_ms}")
+
+
+if __name__ == '__main__':
+    main()
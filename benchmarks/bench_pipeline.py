@@ -0,0 +1,257 @@
+"""
+Preprocessing pipeline benchmark
+Times every preprocessing stage on synthetic seasons of increasing size and records
+wall time and peak memory per stage, so runs can be compared for regressions.
+
+Each size runs in its own Python process, so memory figures of one size are not
+inflated by what an earlier size left behind. Peak memory is the highest resident
+set size sampled while the stage runs (tracemalloc peak where /proc is unavailable),
+reported as the growth over the resident size when the stage started.
+
+Results are saved as JSON under benchmarks/results/. Pass an earlier results file
+with --compare to print per-stage ratios and fail on regressions.
+
+Usage: python benchmarks/bench_pipeline.py --sizes 10k,100k,1M [--compare results/pipeline-....json]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import threading
+import contextlib
+import subprocess
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_DIR, 'benchmarks')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+SIZE_SUFFIXES = {'k': 1000, 'M': 1000000}
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500"""
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+class MemorySampler:
+    """Peak resident set size of this process while a stage runs, sampled in a background thread"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.use_proc = os.path.exists('/proc/self/statm')
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if self.use_proc else 1
+
+    def rss(self):
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * self.page_size
+
+    def _sample(self):
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, self.rss())
+
+    @contextlib.contextmanager
+    def measure(self, result):
+        """Fill result with wall_s and peak_mb for the enclosed block"""
+        if self.use_proc:
+            self.start = self.peak = self.rss()
+            self.done = threading.Event()
+            thread = threading.Thread(target=self._sample, daemon=True)
+            thread.start()
+        else:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            result['wall_s'] = time.perf_counter() - start
+            if self.use_proc:
+                self.done.set()
+                thread.join()
+                self.peak = max(self.peak, self.rss())
+                result['peak_mb'] = (self.peak - self.start) / 1e6
+            else:
+                result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+
+
+def run_size(csv_path, compact=False):
+    """Run every stage once on a synthetic CSV; returns a list of stage results"""
+    sys.path.insert(0, REPO_DIR)
+    import server
+
+    sampler = MemorySampler()
+    stages = []
+
+    def stage(name):
+        stages.append({'stage': name})
+        return sampler.measure(stages[-1])
+
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(open(os.devnull, 'w')):
+        server.CACHE_DIR = os.path.join(tmp_dir, 'cache')
+        out_dir = os.path.join(tmp_dir, 'data')
+        os.makedirs(out_dir)
+
+        with stage('hash'):
+            source_hash = server.file_sha256(csv_path)
+        with stage('parse_csv'):
+            df = server.read_season_csv(csv_path)
+        if server.feather is not None:
+            with stage('cache_write'):
+                server.write_season_cache(df, source_hash)
+            del df
+            with stage('cache_load'):
+                df = server.load_season_frame(csv_path, source_hash)
+        with stage('normalize'):
+            frame = server.normalize_frame(df)
+        del df
+        if compact:
+            with stage('compact'):
+                frame = server.compact_frame(frame)
+        with stage('season_data'):
+            season = server.build_season_data(frame)
+        with stage('team_aggregates'):
+            season.team_aggregates
+        with stage('game_index'):
+            season.game_index
+        with stage('player_form'):
+            season.player_form
+        with stage('player_similarity'):
+            season.player_similarity
+        for chart in server.CHART_PROCESSORS:
+            with stage(f"chart:{chart['name']}"):
+                chart['process'](season, out_dir)
+            stages[-1]['output_bytes'] = os.path.getsize(os.path.join(out_dir, chart['output']))
+
+    return stages
+
+
+def ensure_csv(work_dir, rows, seed):
+    """Synthetic CSV for (rows, seed), generated once and reused by later runs"""
+    from synthetic import write_box_score_csv
+    os.makedirs(work_dir, exist_ok=True)
+    csv_path = os.path.join(work_dir, f'box-scores-{rows}-seed{seed}.csv')
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows} synthetic rows...")
+        write_box_score_csv(csv_path + '.tmp', rows, seed)
+        os.replace(csv_path + '.tmp', csv_path)
+    return csv_path
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy
+    import pandas
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+
+def print_results(results):
+    print(f"\n{'rows':>10} {'stage':<22} {'wall s':>9} {'peak MB':>9} {'out MB':>8}")
+    for size in results['sizes']:
+        for stage in size['stages']:
+            out_mb = f"{stage['output_bytes'] / 1e6:8.2f}" if 'output_bytes' in stage else ''
+            print(f"{size['rows']:>10} {stage['stage']:<22} {stage['wall_s']:9.3f} {stage['peak_mb']:9.1f} {out_mb}")
+
+
+def compare_results(results, baseline, threshold):
+    """Print per-stage ratios against a baseline run; returns the regressed (rows, stage, metric) entries"""
+    base = {(size['rows'], stage['stage']): stage for size in baseline['sizes'] for stage in size['stages']}
+    regressions = []
+    print(f"\nCompared with {baseline['environment'].get('commit')} ({baseline['created']}), "
+          f"regression threshold {threshold:.2f}x")
+    print(f"{'rows':>10} {'stage':<22} {'wall':>8} {'peak':>8}")
+    for size in results['sizes']:
+        for stage in size['stages']:
+            old = base.get((size['rows'], stage['stage']))
+            if old is None:
+                continue
+            ratios = {}
+            for metric, floor in [('wall_s', 0.05), ('peak_mb', 1.0)]:
+                # Tiny stages are dominated by noise; only compare above a floor
+                if max(old[metric], stage[metric]) < floor:
+                    ratios[metric] = None
+                    continue
+                ratios[metric] = stage[metric] / max(old[metric], floor)
+                if ratios[metric] > threshold:
+                    regressions.append((size['rows'], stage['stage'], metric))
+            cells = [f"{ratio:7.2f}x" if ratio is not None else f"{'-':>8}" for ratio in ratios.values()]
+            print(f"{size['rows']:>10} {stage['stage']:<22} {cells[0]} {cells[1]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10k,100k,1M',
+                        help='Comma-separated row counts, e.g. 10k,100k,1M,10M')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'nba-viz-bench'),
+                        help='Where generated CSVs are kept between runs')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/pipeline-<time>.json)')
+    parser.add_argument('--compare', metavar='RESULTS', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Ratio above which a stage counts as a regression')
+    parser.add_argument('--compact', action='store_true',
+                        help='Compact the frame (categorical and downcast dtypes) before the season stages')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        # Child process: run one size and print its stages as JSON
+        csv_path = ensure_csv(args.work_dir, args.single, args.seed)
+        print(json.dumps(run_size(csv_path, args.compact)))
+        return
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': args.seed,
+        'compact': args.compact,
+        'environment': environment(),
+        'sizes': []
+    }
+    for rows in [parse_size(size) for size in args.sizes.split(',')]:
+        ensure_csv(args.work_dir, rows, args.seed)
+        print(f"Benchmarking {rows} rows...")
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--single', str(rows),
+                                '--seed', str(args.seed), '--work-dir', args.work_dir]
+                               + (['--compact'] if args.compact else []),
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            sys.exit(f"Benchmark for {rows} rows failed:\n{child.stderr}")
+        results['sizes'].append({'rows': rows, 'stages': json.loads(child.stdout.splitlines()[-1])})
+
+    print_results(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"\n{len(regressions)} stage metrics regressed past {args.threshold:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
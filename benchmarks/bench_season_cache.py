@@ -0,0 +1,54 @@
+"""
+Season cache benchmark
+Compares a cold CSV parse against a warm load from the typed Feather cache.
+
+Usage: python benchmarks/bench_season_cache.py --rows 500000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+from synthetic import write_box_score_csv
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000, help='Rows in the synthetic CSV')
+    parser.add_argument('--repeat', type=int, default=3, help='Warm loads to average over')
+    args = parser.parse_args()
+
+    if server.feather is None:
+        sys.exit("pyarrow is required for the season cache benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        server.CACHE_DIR = os.path.join(tmp_dir, 'cache')
+        csv_path = os.path.join(tmp_dir, 'season.csv')
+        write_box_score_csv(csv_path, args.rows)
+        source_hash = server.file_sha256(csv_path)
+
+        _, cold = timed(server.read_season_csv, csv_path)
+        _, first = timed(server.load_season_frame, csv_path, source_hash)
+        warm = min(timed(server.load_season_frame, csv_path, source_hash)[1]
+                   for _ in range(args.repeat))
+
+        print(f"\nRows:                    {args.rows}")
+        print(f"CSV size:                {os.path.getsize(csv_path) / 1e6:.1f} MB")
+        print(f"Cache size:              {os.path.getsize(server.season_cache_path(source_hash)) / 1e6:.1f} MB")
+        print(f"Cold CSV parse:          {cold:.3f} s")
+        print(f"First load (parse+save): {first:.3f} s")
+        print(f"Warm cached load:        {warm:.3f} s ({cold / warm:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
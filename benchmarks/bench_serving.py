@@ -0,0 +1,399 @@
+"""
+HTTP serving load test
+Starts the app against a synthetic data/ snapshot and drives concurrent clients at
+fixed request rates, reporting throughput and p50/p95/p99 latency for each route, on
+the Flask development server and on a multi-worker gunicorn server.
+
+Everything runs offline in a scratch directory: the synthetic CSV stands in for the
+Kaggle download, a normal build writes the snapshot, and each server runs from there
+with the season and the in-memory data files loaded before the first request.
+
+Load is open-loop: requests are scheduled at the given rate whether or not earlier
+ones have finished, and latency is measured from each request's scheduled time, so
+a server that falls behind shows it as latency rather than as a lower request rate.
+A rate of 0 runs the clients back to back instead, for peak throughput.
+
+Results are saved as JSON under benchmarks/results/. Pass an earlier results file with
+--compare to print per-route ratios and fail on regressions. gunicorn is optional
+(pip install gunicorn); without it only the development server is measured.
+
+Usage: python benchmarks/bench_serving.py --rates 50,200,0 --duration 10 [--compare results/serving-....json]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import queue
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+import importlib.util
+import multiprocessing
+from urllib.parse import quote
+
+import numpy as np
+
+from bench_pipeline import REPO_DIR, BENCH_DIR, RESULTS_DIR, environment, parse_size
+from synthetic import write_box_score_csv
+
+SERVERS = ['dev', 'gunicorn']
+
+# Sent with every request, as a browser would
+REQUEST_HEADERS = {'Accept-Encoding': 'br, gzip'}
+
+# Seconds to wait for a server to start answering
+STARTUP_TIMEOUT = 120
+
+
+def routes(players):
+    """
+    Route name -> list of paths, cycled through in order. Per-player routes rotate over the
+    given players, so they are not all answered from one cached response.
+    """
+    names = [quote(player) for player in players]
+    return {
+        'index': ['/'],
+        'static': ['/control.js'],
+        'data': ['/data/bench_data.json', '/data/champ_data.json', '/data/trade_impact_data.json'],
+        'api:mvp_top': ['/api/mvp/top?n=10'],
+        'api:scoring_series': ['/api/scoring/series?n=5&points=200'],
+        'api:search': [f'/api/players/search?q={quote(player.split()[0][:3])}' for player in players],
+        'api:player_games': [f'/api/player/{name}/games' for name in names],
+        'api:similar': [f'/api/players/{name}/similar?k=10' for name in names],
+        'api:trade_impact': [f'/api/trade-impact?date=2025-02-01&player={name}' for name in names],
+    }
+
+
+def serving_app():
+    """
+    WSGI app for the scratch directory the server runs in, with the season and the data
+    files already loaded. gunicorn calls it as bench_serving:serving_app() with --preload,
+    so the workers share what the master loaded.
+    """
+    sys.path.insert(0, REPO_DIR)
+    import server
+    server.get_current_season()
+    server.get_served_files()
+    return server.app
+
+
+def build_snapshot(work_dir, rows, seed):
+    """Write the synthetic source and build a data/ snapshot from it in work_dir"""
+    for pattern in ['*.html', '*.js', '*.css']:
+        for path in glob.glob(os.path.join(REPO_DIR, pattern)):
+            shutil.copy(path, work_dir)
+    source_dir = os.path.join(work_dir, 'source')
+    os.makedirs(source_dir)
+    print(f"Generating {rows} synthetic rows...")
+    write_box_score_csv(os.path.join(source_dir, 'box-scores.csv'), rows, seed)
+
+    print("Building the data snapshot...")
+    build = subprocess.run([sys.executable, os.path.abspath(__file__), '--build', source_dir],
+                           cwd=work_dir, capture_output=True, text=True)
+    if build.returncode != 0:
+        sys.exit(f"Snapshot build failed:\n{build.stderr}")
+
+
+def run_build(source_dir):
+    """Child process: build the snapshot in the current directory from the synthetic source"""
+    sys.path.insert(0, REPO_DIR)
+    import server
+    # The synthetic CSV stands in for the Kaggle download, so the build runs offline
+    server.kagglehub.dataset_download = lambda handle: source_dir
+    server.load_and_process_data(force=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, work_dir, port, args):
+    """Start one server on port from work_dir; returns its process once it answers"""
+    if kind == 'dev':
+        command = [sys.executable, os.path.abspath(__file__), '--serve-dev', str(port)]
+    else:
+        command = [sys.executable, '-m', 'gunicorn', 'bench_serving:serving_app()',
+                   '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers),
+                   '--threads', str(args.threads), '--preload', '--log-level', 'warning',
+                   '--pythonpath', f'{BENCH_DIR},{REPO_DIR}']
+    log = open(os.path.join(work_dir, f'{kind}.log'), 'w')
+    process = subprocess.Popen(command, cwd=work_dir, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"{kind} server exited with code {process.returncode}, see {log.name}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/api/status')
+            connection.getresponse().read()
+            connection.close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    sys.exit(f"{kind} server did not start within {STARTUP_TIMEOUT}s, see {log.name}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def serve_dev(port):
+    """Child process: the Flask development server, as server.py runs it but without the reloader"""
+    app = serving_app()
+    app.run(host='127.0.0.1', port=port, debug=True, use_reloader=False)
+
+
+def run_clients(port, paths, rate, duration, clients):
+    """
+    One load generator process: clients threads, each with its own keep-alive connection,
+    sending requests for duration seconds at rate requests per second in total (or back to
+    back with rate 0). Returns {route: {'latencies': [...], 'errors': n}}, latencies in ms.
+    """
+    route_names = list(paths)
+    cursors = {route: 0 for route in paths}
+    results = {route: {'latencies': [], 'errors': 0} for route in paths}
+    lock = threading.Lock()
+    jobs = queue.Queue()
+    start = time.perf_counter() + 0.1
+    end = start + duration
+
+    def next_request(i):
+        route = route_names[i % len(route_names)]
+        with lock:
+            path = paths[route][cursors[route] % len(paths[route])]
+            cursors[route] += 1
+        return route, path
+
+    def send(connection, route, path, scheduled):
+        try:
+            connection.request('GET', path, headers=REQUEST_HEADERS)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            ok = False
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            if ok:
+                results[route]['latencies'].append(elapsed)
+            else:
+                results[route]['errors'] += 1
+
+    def client(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        i = index
+        while True:
+            if rate:
+                job = jobs.get()
+                if job is None:
+                    break
+                send(connection, *job)
+            else:
+                now = time.perf_counter()
+                if now >= end:
+                    break
+                send(connection, *next_request(i), now)
+                i += clients
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    if rate:
+        # Dispatch on schedule; a late dispatcher does not stretch the schedule
+        for i in range(int(rate * duration)):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            jobs.put((*next_request(i), scheduled))
+        for _ in threads:
+            jobs.put(None)
+    else:
+        time.sleep(max(0.0, end - time.perf_counter()))
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _client_process(args):
+    return run_clients(*args)
+
+
+def drive(port, paths, rate, duration, clients, processes):
+    """Run the load split over processes load generators and merge their results per route"""
+    per_process = [(port, paths, rate / processes, duration, max(1, clients // processes))
+                   for _ in range(processes)]
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.map(_client_process, per_process)
+    elapsed = max(time.perf_counter() - start, duration)
+
+    summary = {}
+    for route in paths:
+        latencies = np.array([ms for part in parts for ms in part[route]['latencies']])
+        errors = sum(part[route]['errors'] for part in parts)
+        summary[route] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': len(latencies) / duration,
+            **({f'p{q}_ms': float(np.percentile(latencies, q)) for q in [50, 95, 99]} if len(latencies) else {}),
+            'max_ms': float(latencies.max()) if len(latencies) else None
+        }
+    total = sum(route['requests'] for route in summary.values())
+    return {'rate': rate, 'duration': duration, 'wall_s': elapsed,
+            'throughput': total / duration, 'routes': summary}
+
+
+def discover_players(port, count):
+    """Names of the charted season's top scorers, for the per-player routes"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    connection.request('GET', f'/api/scoring/top?n={count}')
+    players = json.loads(connection.getresponse().read())['players']
+    connection.close()
+    return [player['player'] for player in players]
+
+
+def print_results(results):
+    print(f"\n{'server':<10} {'rate':>6} {'route':<20} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for server in results['servers']:
+        for run in server['runs']:
+            rate = run['rate'] or 'max'
+            for route, stats in run['routes'].items():
+                percentiles = ''.join(f"{stats[f'p{q}_ms']:8.1f} " if f'p{q}_ms' in stats else f"{'-':>8} "
+                                      for q in [50, 95, 99])
+                print(f"{server['server']:<10} {rate:>6} {route:<20} {stats['throughput']:8.1f} "
+                      f"{percentiles}{stats['errors']:>7}")
+            print(f"{server['server']:<10} {rate:>6} {'(all)':<20} {run['throughput']:8.1f}")
+
+
+def compare_results(results, baseline, threshold):
+    """Print per-route ratios against a baseline run; returns the regressed (server, rate, route, metric) entries"""
+    base = {(server['server'], run['rate'], route): stats
+            for server in baseline['servers'] for run in server['runs'] for route, stats in run['routes'].items()}
+    regressions = []
+    print(f"\nCompared with {baseline['environment'].get('commit')} ({baseline['created']}), "
+          f"regression threshold {threshold:.2f}x")
+    print(f"{'server':<10} {'rate':>6} {'route':<20} {'req/s':>8} {'p99':>8}")
+    for server in results['servers']:
+        for run in server['runs']:
+            for route, stats in run['routes'].items():
+                old = base.get((server['server'], run['rate'], route))
+                if old is None or 'p99_ms' not in old or 'p99_ms' not in stats:
+                    continue
+                # Lower throughput and higher latency are both regressions
+                ratios = {'throughput': old['throughput'] / max(stats['throughput'], 1e-9),
+                          'p99_ms': stats['p99_ms'] / max(old['p99_ms'], 1e-9)}
+                for metric, ratio in ratios.items():
+                    if ratio > threshold:
+                        regressions.append((server['server'], run['rate'], route, metric))
+                print(f"{server['server']:<10} {run['rate'] or 'max':>6} {route:<20} "
+                      f"{1 / ratios['throughput']:7.2f}x {ratios['p99_ms']:7.2f}x")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='100k', help='Rows in the synthetic season, e.g. 100k or 1M')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--servers', default=','.join(SERVERS), help=f"Comma-separated servers to test ({', '.join(SERVERS)})")
+    parser.add_argument('--rates', default='50,200,0',
+                        help='Comma-separated total request rates per second; 0 sends back to back')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load at each rate')
+    parser.add_argument('--warmup', type=float, default=2, help='Seconds of unrecorded load before each server is measured')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--client-processes', type=int, default=2,
+                        help='Load generator processes the clients are spread over')
+    parser.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1),
+                        help='gunicorn worker processes (default: CPU count, at least 2)')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker')
+    parser.add_argument('--work-dir', help='Keep the snapshot and server logs here instead of a temporary directory')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/serving-<time>.json)')
+    parser.add_argument('--compare', metavar='RESULTS', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Ratio above which a route counts as a regression')
+    parser.add_argument('--build', metavar='SOURCE', help=argparse.SUPPRESS)
+    parser.add_argument('--serve-dev', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.build:
+        run_build(args.build)
+        return
+    if args.serve_dev:
+        serve_dev(args.serve_dev)
+        return
+
+    servers = args.servers.split(',')
+    if 'gunicorn' in servers and importlib.util.find_spec('gunicorn') is None:
+        print("gunicorn is not installed (pip install gunicorn), measuring the development server only")
+        servers.remove('gunicorn')
+    rates = [float(rate) for rate in args.rates.split(',')]
+    rows = parse_size(args.rows)
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rows': rows,
+        'seed': args.seed,
+        'clients': args.clients,
+        'client_processes': args.client_processes,
+        'environment': environment(),
+        'servers': []
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        if not os.path.lexists(os.path.join(work_dir, 'data')):
+            build_snapshot(work_dir, rows, args.seed)
+
+        for kind in servers:
+            port = free_port()
+            label = kind if kind == 'dev' else f'{kind} ({args.workers} workers x {args.threads} threads)'
+            print(f"Starting {label}...")
+            process = start_server(kind, work_dir, port, args)
+            try:
+                paths = routes(discover_players(port, 10))
+                if args.warmup:
+                    drive(port, paths, 0, args.warmup, args.clients, args.client_processes)
+                server_results = {'server': kind, 'workers': args.workers if kind != 'dev' else 1,
+                                  'threads': args.threads if kind != 'dev' else None, 'runs': []}
+                for rate in rates:
+                    print(f"  {rate or 'max'} requests/s for {args.duration:g}s")
+                    server_results['runs'].append(
+                        drive(port, paths, rate, args.duration, args.clients, args.client_processes))
+                results['servers'].append(server_results)
+            finally:
+                stop_server(process)
+
+    print_results(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"serving-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"\n{len(regressions)} route metrics regressed past {args.threshold:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
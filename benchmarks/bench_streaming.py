@@ -0,0 +1,131 @@
+"""
+Streaming build memory benchmark
+Builds every chart from one synthetic CSV in memory and with the chunked streaming
+build, each in its own process, and compares peak memory, wall time and outputs.
+
+--memory-limit caps each process's address space (Linux), so a CSV several times
+larger than the limit shows the in-memory build failing while the streaming build
+stays within it. Peak memory is read from /proc, so the benchmark needs Linux.
+
+Usage: python benchmarks/bench_streaming.py --rows 2000000 --chunk-rows 100000 --memory-limit 1024
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import resource
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+from synthetic import write_box_score_csv
+
+
+def build(mode, csv_path, out_dir, chunk_rows, memory_limit):
+    """Child process: build every chart with one mode and return its wall time and peak memory"""
+    if memory_limit:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    server.CACHE_DIR = os.path.join(out_dir, 'cache')
+    start = time.perf_counter()
+    if mode == 'stream':
+        source = server.describe_source([csv_path])
+        server.stream_chart_outputs(source, [], server.CHART_PROCESSORS, out_dir, chunk_rows)
+    else:
+        season = server.build_season_data(server.normalize_frame(server.read_season_csv(csv_path)))
+        _, errors = server.run_chart_processors(season, server.CHART_PROCESSORS, out_dir=out_dir)
+        if errors:
+            raise Exception(f"Chart processors failed: {', '.join(errors)}")
+    return {'seconds': time.perf_counter() - start, 'peak_mb': peak_memory_mb()}
+
+
+def peak_memory_mb():
+    """
+    Peak resident memory of this process in MB.
+    
+    VmHWM starts over at exec, unlike ru_maxrss, which keeps the peak the parent had
+    when it forked (here, the CSV generation).
+    """
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def run_child(mode, csv_path, out_dir, args):
+    """Run one build in a fresh interpreter; returns its measurements, or None if it failed"""
+    os.makedirs(out_dir)
+    command = [sys.executable, os.path.abspath(__file__), '--child', mode, '--csv', csv_path,
+               '--out', out_dir, '--chunk-rows', str(args.chunk_rows), '--memory-limit', str(args.memory_limit)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ['exited with code %d' % result.returncode])[-1]
+        print(f"  {mode} build failed: {error}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows in the synthetic CSV')
+    parser.add_argument('--chunk-rows', type=int, default=server.STREAM_CHUNK_ROWS, help='Rows per streamed chunk')
+    parser.add_argument('--memory-limit', type=int, default=0,
+                        help='Address space limit of each build process in MB (default: none)')
+    parser.add_argument('--work-dir', help='Keep the CSV and outputs here instead of a temporary directory')
+    parser.add_argument('--child', choices=['memory', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        try:
+            with contextlib.redirect_stdout(open(os.devnull, 'w')):
+                result = build(args.child, args.csv, args.out, args.chunk_rows, args.memory_limit)
+        except MemoryError:
+            sys.exit("out of memory")
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        csv_path = os.path.join(work_dir, f'box-scores-{args.rows}.csv')
+        if not os.path.exists(csv_path):
+            print(f"Generating {args.rows} synthetic rows...")
+            write_box_score_csv(csv_path + '.tmp', args.rows)
+            os.replace(csv_path + '.tmp', csv_path)
+        run_dir = tempfile.mkdtemp(dir=work_dir)
+
+        print(f"CSV size: {os.path.getsize(csv_path) / 1e6:.1f} MB"
+              + (f", memory limit {args.memory_limit} MB" if args.memory_limit else ""))
+        results = {mode: run_child(mode, csv_path, os.path.join(run_dir, mode), args)
+                   for mode in ['memory', 'stream']}
+
+        print(f"\n{'build':<10} {'wall s':>8} {'peak MB':>9}")
+        for mode, result in results.items():
+            if result:
+                print(f"{mode:<10} {result['seconds']:>8.2f} {result['peak_mb']:>9.1f}")
+            else:
+                print(f"{mode:<10} {'failed':>8}")
+
+        if all(results.values()):
+            mismatches = []
+            for chart in server.CHART_PROCESSORS:
+                outputs = []
+                for mode in results:
+                    with open(os.path.join(run_dir, mode, chart['output'])) as f:
+                        outputs.append(json.load(f))
+                if not server.json_equivalent(*outputs):
+                    mismatches.append(chart['name'])
+            print("\nOutputs match" if not mismatches else f"\nOutputs differ: {', '.join(mismatches)}")
+            if mismatches:
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
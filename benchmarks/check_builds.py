@@ -0,0 +1,111 @@
+"""
+Build mode consistency check
+Builds one synthetic CSV with the server's --build-only CLI in every build mode
+(default, --compact, --stream, process workers), each in its own scratch directory
+and process, and checks that every chart output matches the default build.
+
+The synthetic CSV stands in for the Kaggle download, so the check runs offline. It
+exits non-zero if a build fails or an output differs.
+
+Usage: python benchmarks/check_builds.py --rows 100000 [--modes compact,stream]
+"""
+
+import os
+import sys
+import json
+import runpy
+import argparse
+import tempfile
+import subprocess
+
+from bench_pipeline import REPO_DIR
+from synthetic import write_box_score_csv
+
+# Build mode -> extra server.py arguments
+BUILD_MODES = {
+    'default': [],
+    'compact': ['--compact'],
+    'stream': ['--stream', '--chunk-rows', '20000'],
+    'process': ['--workers', '2', '--executor', 'process'],
+}
+
+
+def run_child(build_dir, source_dir, server_args):
+    """Child process: run server.py as the CLI from build_dir, with the download pointed at source_dir"""
+    os.chdir(build_dir)
+    sys.path.insert(0, REPO_DIR)
+    import kagglehub
+    kagglehub.dataset_download = lambda handle: source_dir
+    sys.argv = ['server.py'] + server_args
+    runpy.run_path(os.path.join(REPO_DIR, 'server.py'), run_name='__main__')
+
+
+def build(mode, work_dir, source_dir):
+    """Build in a fresh directory; returns the directory, or None if the build failed"""
+    build_dir = os.path.join(work_dir, mode)
+    os.makedirs(build_dir)
+    command = [sys.executable, os.path.abspath(__file__), '--child', build_dir, source_dir,
+               '--build-only', *BUILD_MODES[mode]]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ['exited with code %d' % result.returncode])[-1]
+        print(f"  {mode} build failed: {error}")
+        return None
+    return build_dir
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3], sys.argv[4:])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='Rows in the synthetic CSV')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--modes', default=','.join(mode for mode in BUILD_MODES if mode != 'default'),
+                        help='Comma-separated modes compared with the default build')
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_DIR)
+    import server
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_dir = os.path.join(work_dir, 'source')
+        os.makedirs(source_dir)
+        print(f"Generating {args.rows} synthetic rows...")
+        write_box_score_csv(os.path.join(source_dir, 'box-scores.csv'), args.rows, args.seed)
+
+        modes = ['default'] + [mode for mode in args.modes.split(',') if mode != 'default']
+        builds = {}
+        for mode in modes:
+            print(f"Building {mode}...")
+            builds[mode] = build(mode, work_dir, source_dir)
+        if builds['default'] is None:
+            sys.exit("The default build failed")
+
+        failed = [mode for mode, build_dir in builds.items() if build_dir is None]
+        print(f"\n{'mode':<10} {'chart':<14} result")
+        for mode in modes[1:]:
+            if builds[mode] is None:
+                continue
+            for chart in server.CHART_PROCESSORS:
+                outputs = []
+                for build_dir in [builds['default'], builds[mode]]:
+                    with open(os.path.join(build_dir, server.DATA_DIR, chart['output']), 'rb') as f:
+                        outputs.append(f.read())
+                if outputs[0] == outputs[1]:
+                    result = 'identical'
+                elif server.json_equivalent(*[json.loads(output) for output in outputs]):
+                    result = 'equivalent'
+                else:
+                    result = 'DIFFERS'
+                    failed.append(f"{mode}:{chart['name']}")
+                print(f"{mode:<10} {chart['name']:<14} {result}")
+
+    if failed:
+        sys.exit(f"\nFailed: {', '.join(failed)}")
+    print("\nAll build modes match the default build")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Synthetic box-score generator
+Builds deterministic player game logs with the same columns as the Kaggle season file,
+at any size, without network access.
+
+Rows are generated game by game: every game pairs two teams on a date, each team's
+players get one row with a shared opponent and result, and seasons of 1230 games are
+laid out back in time from the 2024-25 season as the row count grows. A team plays at
+most one game per date.
+"""
+
+import numpy as np
+import pandas as pd
+
+TEAMS = np.array(['ATL', 'BOS', 'BRK', 'CHI', 'CHO', 'CLE', 'DAL', 'DEN', 'DET', 'GSW',
+                  'HOU', 'IND', 'LAC', 'LAL', 'MEM', 'MIA', 'MIL', 'MIN', 'NOP', 'NYK',
+                  'OKC', 'ORL', 'PHI', 'PHO', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS'])
+PLAYERS_PER_TEAM = 13
+GAMES_PER_SEASON = 1230
+SEASON_DAYS = 170
+LATEST_SEASON = 2024
+CSV_CHUNK_GAMES = 40000
+
+
+def generate_box_scores(rows, seed=0, first_game=0):
+    """
+    Return a DataFrame of `rows` player game rows in the Kaggle column layout.
+    
+    first_game offsets the generated games, so consecutive calls can produce one
+    long history piece by piece; the same arguments always give the same rows.
+    """
+    rng = np.random.default_rng([seed, first_game])
+    rows_per_game = 2 * PLAYERS_PER_TEAM
+    games = -(-rows // rows_per_game)
+
+    # Seasons run back in time from LATEST_SEASON; games spread over each season's days
+    game_ids = np.arange(first_game, first_game + games)
+    seasons = game_ids // GAMES_PER_SEASON
+    season_start = pd.to_datetime([f'{LATEST_SEASON - season}-10-22'
+                                   for season in range(seasons[0], seasons[-1] + 1)])
+    season_game = game_ids % GAMES_PER_SEASON
+    day = season_game * SEASON_DAYS // GAMES_PER_SEASON
+    dates = season_start[seasons - seasons[0]] + pd.to_timedelta(day, unit='D')
+
+    # Each day is one round of a rotating round-robin (circle method), so no team plays
+    # twice on a date: the last team meets the round's team, and the other teams pair off
+    # around the circle. A day's games take distinct pairings, starting at a daily offset.
+    day_first_game = -(-day * GAMES_PER_SEASON // SEASON_DAYS)
+    day_number = seasons * SEASON_DAYS + day
+    circle = len(TEAMS) - 1
+    round_ = day_number % circle
+    pairing = (season_game - day_first_game + day_number * 8) % (len(TEAMS) // 2)
+    home = np.where(pairing == 0, circle, (round_ + pairing) % circle)
+    away = (round_ - pairing) % circle
+    swap = rng.random(games) < 0.5
+    home, away = np.where(swap, away, home), np.where(swap, home, away)
+    home_wins = rng.random(games) < 0.55
+
+    # Expand games to player rows: the first half of each game's rows are the home team
+    game = np.repeat(np.arange(games), rows_per_game)[:rows]
+    slot = np.tile(np.arange(rows_per_game), games)[:rows]
+    is_home = slot < PLAYERS_PER_TEAM
+    team = np.where(is_home, home[game], away[game])
+    opponent = np.where(is_home, away[game], home[game])
+    won = home_wins[game] == is_home
+    player = team * PLAYERS_PER_TEAM + slot % PLAYERS_PER_TEAM
+
+    # Per-player skill (fixed for a seed) so averages differ between players
+    skill = np.minimum(np.random.default_rng(seed).gamma(2.0, 0.5, len(TEAMS) * PLAYERS_PER_TEAM), 3.0)[player]
+    minutes = np.clip(rng.normal(12 + 10 * skill, 6, rows), 1, 48).round(1)
+    fga = rng.poisson(minutes * 0.35 * (0.6 + skill / 2))
+    fg = rng.binomial(fga, 0.46)
+    three_pa = rng.binomial(fga, 0.38)
+    three_p = np.minimum(rng.binomial(three_pa, 0.36), fg)
+    fta = rng.poisson(minutes * 0.08 * skill)
+    ft = rng.binomial(fta, 0.78)
+    orb = rng.poisson(minutes * 0.03)
+    drb = rng.poisson(minutes * 0.12)
+    ast = rng.poisson(minutes * 0.09 * skill)
+    stl = rng.poisson(minutes * 0.025)
+    blk = rng.poisson(minutes * 0.02)
+    tov = rng.poisson(minutes * 0.05)
+    pf = rng.poisson(minutes * 0.06)
+    pts = 2 * fg + three_p + ft
+    gmsc = (pts + 0.4 * fg - 0.7 * fga - 0.4 * (fta - ft) + 0.7 * orb + 0.3 * drb
+            + stl + 0.7 * ast + 0.7 * blk - 0.4 * pf - tov).round(1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'Player': pd.Categorical.from_codes(
+                player, [f'{t} Player {i}' for t in TEAMS for i in range(PLAYERS_PER_TEAM)]).astype(str),
+            'Tm': TEAMS[team],
+            'Opp': TEAMS[opponent],
+            'Res': np.where(won, 'W', 'L'),
+            'MP': minutes,
+            'FG': fg,
+            'FGA': fga,
+            'FG%': np.where(fga > 0, fg / fga, np.nan).round(3),
+            '3P': three_p,
+            '3PA': three_pa,
+            '3P%': np.where(three_pa > 0, three_p / three_pa, np.nan).round(3),
+            'FT': ft,
+            'FTA': fta,
+            'FT%': np.where(fta > 0, ft / fta, np.nan).round(3),
+            'ORB': orb,
+            'DRB': drb,
+            'TRB': orb + drb,
+            'AST': ast,
+            'STL': stl,
+            'BLK': blk,
+            'TOV': tov,
+            'PF': pf,
+            'PTS': pts,
+            'GmSc': gmsc,
+            'Data': dates[game].strftime('%Y-%m-%d'),
+        })
+
+
+def write_box_score_csv(path, rows, seed=0):
+    """Write `rows` synthetic rows to a CSV file, CSV_CHUNK_GAMES games at a time"""
+    chunk_rows = CSV_CHUNK_GAMES * 2 * PLAYERS_PER_TEAM
+    with open(path, 'w', newline='') as f:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate_box_scores(min(chunk_rows, rows - start), seed,
+                                        first_game=start // (2 * PLAYERS_PER_TEAM))
+            chunk.to_csv(f, index=False, header=start == 0)
@@ -23,20 +23,75 @@ function setupEventListeners() {
     }
 }
 
+// Turn a columnar payload ({format: 'columnar', length, columns}) written by
+// `python server.py --json-format columnar` back into an array of records.
+// Any other payload is returned unchanged.
+function decodeColumnar(payload) {
+    if (!payload || payload.format !== 'columnar') return payload;
+    
+    const DAY_MS = 24 * 60 * 60 * 1000;
+    const names = Object.keys(payload.columns);
+    
+    // Resolve each column to a plain array of values first
+    const decoded = names.map(name => {
+        const column = payload.columns[name];
+        if (Array.isArray(column)) return column;
+        if (column.dict) return column.codes.map(code => code === null ? null : column.dict[code]);
+        // Dates repeat across many rows, so format each distinct day offset only once
+        const start = Date.parse(column.start);
+        const dates = {};
+        return column.days.map(day => {
+            if (day === null) return null;
+            if (!(day in dates)) dates[day] = new Date(start + day * DAY_MS).toISOString().slice(0, 10);
+            return dates[day];
+        });
+    });
+    
+    // Build rows with a generated object literal so every record shares one hidden class
+    const makeRecord = new Function('columns', 'i',
+        'return {' + names.map((name, j) => `${JSON.stringify(name)}: columns[${j}][i]`).join(', ') + '};');
+    const records = new Array(payload.length);
+    for (let i = 0; i < payload.length; i++) {
+        records[i] = makeRecord(decoded, i);
+    }
+    return records;
+}
+
+// data/manifest.json maps each data file to a content-hashed URL, which the browser
+// can cache indefinitely. Without a manifest the plain data/ URLs are used.
+function loadDataManifest() {
+    return fetch('data/manifest.json')
+        .then(response => response.ok ? response.json() : {files: {}})
+        .catch(() => ({files: {}}));
+}
+
+function dataUrl(manifest, name) {
+    return manifest.files[name] || `data/${name}`;
+}
+
+// Points per player in the scoring series: about one every 4 pixels of chart width,
+// so the payload and render time follow the screen rather than the length of the history
+function scoringSeriesPoints() {
+    const canvas = document.getElementById('scoringChart');
+    const width = canvas ? canvas.clientWidth : 0;
+    return Math.max(50, Math.round((width || 800) / 4));
+}
+
 function loadAllData() {
     // Fetch all the required JSON data files
-    Promise.all([
-        fetch('data/mvp_data.json').then(response => response.json()),
-        fetch('data/champ_data.json').then(response => response.json()),
-        fetch('data/scoring_data.json').then(response => response.json()),
-        fetch('data/bench_data.json').then(response => response.json()),
-        fetch('data/trade_impact_data.json').then(response => response.json())
-    ])
+    loadDataManifest()
+    .then(manifest => Promise.all([
+        fetch('api/mvp/top?n=10').then(response => response.json()),
+        fetch(dataUrl(manifest, 'champ_data.json')).then(response => response.json()),
+        fetch(`api/scoring/series?n=5&points=${scoringSeriesPoints()}`).then(response => response.json()),
+        fetch(dataUrl(manifest, 'bench_data.json')).then(response => response.json()).then(decodeColumnar),
+        fetch(dataUrl(manifest, 'trade_impact_data.json')).then(response => response.json())
+    ]))
     .then(([mvpData, champData, scoringData, benchData, tradeImpactData]) => {
         // Initialize all charts with their respective data
-        if (window.initMVPChart) window.initMVPChart(mvpData);
+        if (window.initMVPChart) window.initMVPChart(mvpData.players);
         if (window.initChampChart) window.initChampChart(champData);
-        if (window.initScoringChart) window.initScoringChart(scoringData);
+        if (window.initScoringChart) window.initScoringChart(scoringData.players);
         if (window.initBenchChart) window.initBenchChart(benchData);
         if (window.initTradeImpactChart) window.initTradeImpactChart(tradeImpactData);
         
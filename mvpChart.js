@@ -4,75 +4,18 @@ let mvpChart;
 let mvpDetailChart;
 let mvpData = [];
 
-// Initialize the MVP Chart with data
+// Initialize the MVP Chart with the leaderboard from /api/mvp/top
+// (players already ranked by MVP score on the server, each with their last 10 game scores)
 window.initMVPChart = function(data) {
     mvpData = data;
     
-    // Calculate MVP scores for each player
-    const processedData = calculateMVPScores(data);
-    
     // Create the main bar chart
-    createMVPBarChart(processedData);
+    createMVPBarChart(data);
     
     // Set up the container for the detail chart (initially empty)
     setupDetailChartContainer();
 };
 
-function calculateMVPScores(data) {
-    // Group by player and calculate the average MVP score
-    const playerStats = {};
-    
-    data.forEach(game => {
-        if (!playerStats[game.Player]) {
-            playerStats[game.Player] = {
-                games: 0,
-                totalPTS: 0,
-                totalAST: 0,
-                totalTRB: 0,
-                totalGmSc: 0,
-                gameScores: [] // Store individual game scores for the detail chart
-            };
-        }
-        
-        playerStats[game.Player].games++;
-        playerStats[game.Player].totalPTS += game.PTS;
-        playerStats[game.Player].totalAST += game.AST;
-        playerStats[game.Player].totalTRB += game.TRB;
-        playerStats[game.Player].totalGmSc += game.GmSc;
-        
-        // Store the game score with date for the detail chart
-        playerStats[game.Player].gameScores.push({
-            date: game.Date,
-            score: game.GmSc
-        });
-    });
-    
-    // Calculate MVP score and average stats
-    const mvpScores = Object.keys(playerStats).map(player => {
-        const stats = playerStats[player];
-        const avgPTS = stats.totalPTS / stats.games;
-        const avgAST = stats.totalAST / stats.games;
-        const avgTRB = stats.totalTRB / stats.games;
-        const avgGmSc = stats.totalGmSc / stats.games;
-        
-        // MVP Score formula: PTS * 0.4 + AST * 0.3 + TRB * 0.2 + GmSc * 0.1
-        const mvpScore = (avgPTS * 0.4) + (avgAST * 0.3) + (avgTRB * 0.2) + (avgGmSc * 0.1);
-        
-        return {
-            player,
-            mvpScore,
-            avgPTS,
-            avgAST,
-            avgTRB,
-            avgGmSc,
-            gameScores: stats.gameScores.sort((a, b) => new Date(a.date) - new Date(b.date)).slice(-10) // Last 10 games
-        };
-    });
-    
-    // Sort by MVP score and take the top 10
-    return mvpScores.sort((a, b) => b.mvpScore - a.mvpScore).slice(0, 10);
-}
-
 function createMVPBarChart(data) {
     const ctx = document.getElementById('mvpChart').getContext('2d');
     
@@ -4,19 +4,13 @@ let scoringChart;
 let scoringData = [];
 let activePlayerFilters = {};
 
-// Initialize the Scoring Chart with data
+// Initialize the Scoring Chart with the series from /api/scoring/series
+// (top scorers ranked on the server, each with their per-game points in date order,
+// downsampled on the server to a fixed number of points per player)
 window.initScoringChart = function(data) {
     scoringData = data;
     
-    // Format dates properly - convert string dates to Date objects
-    scoringData.forEach(game => {
-        if (typeof game.Date === 'string') {
-            game.Date = new Date(game.Date);
-        }
-    });
-    
-    // Get the top 5 scoring players
-    const topScoringPlayers = getTopScoringPlayers(data, 5);
+    const topScoringPlayers = data.map(p => p.player);
     
     // Initialize all players as active
     topScoringPlayers.forEach(player => {
@@ -30,33 +24,6 @@ window.initScoringChart = function(data) {
     createScoringLineChart(topScoringPlayers);
 };
 
-function getTopScoringPlayers(data, count) {
-    // Group data by player and calculate average points
-    const playerScoring = {};
-    
-    data.forEach(game => {
-        if (!playerScoring[game.Player]) {
-            playerScoring[game.Player] = {
-                totalPTS: 0,
-                games: 0
-            };
-        }
-        
-        playerScoring[game.Player].totalPTS += game.PTS;
-        playerScoring[game.Player].games++;
-    });
-    
-    // Calculate average PTS and sort players
-    const sortedPlayers = Object.keys(playerScoring).map(player => ({
-        player,
-        avgPTS: playerScoring[player].totalPTS / playerScoring[player].games
-    }))
-    .sort((a, b) => b.avgPTS - a.avgPTS)
-    .slice(0, count);
-    
-    return sortedPlayers.map(p => p.player);
-}
-
 function createPlayerToggleOptions(players) {
     const container = document.getElementById('playerToggle');
     if (!container) return;
@@ -113,7 +80,6 @@ function createScoringLineChart(players) {
                 x: {
                     type: 'time',
                     time: {
-                        unit: 'day',
                         tooltipFormat: 'MMM d, yyyy',
                         displayFormats: {
                             day: 'MMM d'
@@ -155,13 +121,13 @@ function createScoringLineChart(players) {
 }
 
 function processPlayerScoringData(playerName) {
-    return scoringData
-        .filter(game => game.Player === playerName)
-        .sort((a, b) => new Date(a.Date) - new Date(b.Date))
-        .map(game => ({
-            x: game.Date,
-            y: game.PTS
-        }));
+    const playerData = scoringData.find(p => p.player === playerName);
+    if (!playerData) return [];
+    
+    return playerData.games.map(game => ({
+        x: new Date(game.date),
+        y: game.pts
+    }));
 }
 
 function getPlayerColor(playerName) {
@@ -5,15 +5,47 @@ This script processes raw NBA data into JSON files for the visualization.
 
 import os
 import json
+import gzip
+import hashlib
+import argparse
 import pandas as pd
 import numpy as np
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, request, g
 from flask_cors import CORS
 import kagglehub
 import glob
 import sys
+import math
+import bisect
+import unicodedata
+import time
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import cached_property, lru_cache
 from datetime import datetime
 
+# Copy-on-write lets every processor share the normalized frame without defensive copies
+# (it is always on from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# pyarrow is optional: without it the season cache is disabled and the CSV is parsed every build
+try:
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+except ImportError:
+    feather = None
+
+# brotli is optional: without it data files are precompressed with gzip only
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Custom JSON encoder to handle datetime and pandas Timestamp objects
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -21,21 +53,890 @@ class CustomJSONEncoder(json.JSONEncoder):
             return obj.strftime('%Y-%m-%d')
         return super().default(obj)
 
+# Directory the chart JSON files are served from. After the first build it is a symlink
+# to the current snapshot, which is swapped atomically when a rebuild finishes.
+DATA_DIR = 'data'
+
 # Create data directory if it doesn't exist
-os.makedirs('data', exist_ok=True)
+if not os.path.lexists(DATA_DIR):
+    os.makedirs(DATA_DIR)
+
+# Versioned snapshots of the chart outputs; builds write into a new one while the current one is served
+SNAPSHOTS_DIR = '.snapshots'
+SNAPSHOTS_KEPT = 3
+
+# Precompressed copies of each JSON output are written next to it as <name>.gz and <name>.br
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# Faster levels for the outputs an ingest rewrites, so a nightly ingest does not spend its
+# time recompressing large files; they return to the levels above when their chart is rebuilt
+INGEST_COMPRESSION = {'br': 5, 'gzip': 6}
+COMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Lists the content-hashed URL of every data file; control.js loads it first
+DATA_MANIFEST = 'manifest.json'
+
+# Hex digits of a file's SHA-256 used in its content-hashed URL and ETag
+CONTENT_HASH_LENGTH = 16
+
+# Content-hashed URLs never change content; the plain ones are revalidated with their ETag
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Layout of the per-game JSON outputs: 'records' (a list of row objects) or 'columnar'
+# (one array per field, with dictionary-encoded names and day-offset dates)
+JSON_FORMAT = 'records'
+
+# Rows serialized at a time when streaming the records layout
+JSON_CHUNK_ROWS = 20000
+
+# CSV rows parsed at a time by streaming builds (--stream), which never hold a whole source in memory
+STREAM_CHUNK_ROWS = 250000
+
+# Per-player stats summed by streaming builds, the same ones player_totals keeps
+STREAM_PLAYER_STATS = ['PTS', 'AST', 'TRB', 'GmSc']
+
+# Compact frames (--compact): text columns become categoricals, complete counting stats the
+# smallest integer type that holds them and shooting percentages float32. MP and GmSc stay
+# float64 because the per-game outputs write them out verbatim.
+COMPACT_FRAME = False
+COMPACT_CATEGORIES = ['Player', 'Tm', 'Opp', 'Res', 'Conference', 'Starter', 'Season']
+COMPACT_COUNTS = ['PTS', 'AST', 'TRB', 'FG', 'FGA', '3P', '3PA', 'FT', 'FTA', 'ORB', 'DRB', 'STL', 'BLK', 'TOV', 'PF']
+COMPACT_RATES = ['FG%', '3P%', 'FT%']
+
+# Build manifest kept next to data/ so unchanged charts can be skipped on startup
+BUILD_MANIFEST = 'build_manifest.json'
+
+# Typed columnar copies of parsed season CSVs, keyed by the CSV's content hash
+CACHE_DIR = '.cache'
+
+# Rows added by incremental ingest, and the aggregates kept up to date between ingests
+INCREMENTS_DIR = os.path.join(CACHE_DIR, 'increments')
+AGGREGATE_STATE = os.path.join(CACHE_DIR, 'aggregates.pkl')
+
+# Bump when the cached season layout changes so stale caches are rebuilt
+SEASON_CACHE_VERSION = 2
+
+# Explicit dtypes for the box-score columns we know about; anything else is inferred.
+# Counting stats (PTS, AST, FG, ...) are left to inference so they stay integers when complete.
+SEASON_DTYPES = {
+    'Player': 'object', 'Tm': 'object', 'Opp': 'object', 'Res': 'object',
+    'MP': 'float64', 'GmSc': 'float64',
+    'FG%': 'float64', '3P%': 'float64', 'FT%': 'float64',
+}
+
+# Canonical column name -> source column names it may appear under (case-insensitive).
+# The Kaggle season file calls its date column "Data".
+COLUMN_ALIASES = {
+    'Player': ['Player'],
+    'Tm': ['Tm', 'Team'],
+    'Opp': ['Opp'],
+    'Date': ['Date', 'Data'],
+    'Res': ['Res', 'Result', 'WL', 'W/L'],
+    'MP': ['MP', 'MIN', 'Minutes', 'Minutes Played'],
+    'PTS': ['PTS'],
+    'AST': ['AST'],
+    'TRB': ['TRB'],
+    'GmSc': ['GmSc'],
+    'FG': ['FG', 'FGM'],
+    'FGA': ['FGA'],
+    'FG%': ['FG%'],
+    '3P': ['3P', '3PM'],
+    '3PA': ['3PA'],
+    '3P%': ['3P%'],
+    'FT': ['FT', 'FTM'],
+    'FTA': ['FTA'],
+    'FT%': ['FT%'],
+    'ORB': ['ORB', 'OREB'],
+    'DRB': ['DRB', 'DREB'],
+    'STL': ['STL'],
+    'BLK': ['BLK'],
+    'PF': ['PF', 'Fouls'],
+    'TOV': ['TOV', 'TO'],
+    'Conference': ['Conference'],
+    'Starter': ['Starter', 'Start', 'GS', 'Role'],
+}
+
+# Canonical columns that fall back to a substring match when no alias matches exactly
+FUZZY_COLUMNS = {'Player', 'Tm', 'Date', 'PTS', 'AST', 'TRB', 'Starter'}
+
+# Team conferences, including the Basketball-Reference abbreviations (BRK, CHO, PHO)
+EASTERN_TEAMS = ['BOS', 'NYK', 'PHI', 'TOR', 'CHI', 'CLE', 'DET', 'IND', 'MIL',
+                 'ATL', 'CHA', 'CHO', 'MIA', 'ORL', 'WAS', 'BKN', 'BRK']
+WESTERN_TEAMS = ['DAL', 'HOU', 'MEM', 'NOP', 'SAS', 'DEN', 'MIN', 'OKC', 'POR',
+                 'UTA', 'GSW', 'LAC', 'LAL', 'PHX', 'PHO', 'SAC']
+TEAM_CONFERENCES = {**{team: 'East' for team in EASTERN_TEAMS},
+                    **{team: 'West' for team in WESTERN_TEAMS}}
+
+# Trade shown on the trade impact chart, with each player's post-trade team
+TRADE_IMPACT_DATE = "2025-02-01"
+TRADE_IMPACT_PLAYERS = {
+    'Luka Dončić': 'LAL',  # UPDATED: Luka traded to Lakers with accent characters
+    'Anthony Davis': 'DAL'  # UPDATED: Davis traded to Mavericks
+}
+
+# Rolling form: trailing windows in games, and the span (in games) of the exponentially weighted mean
+FORM_WINDOWS = [5, 10, 20]
+FORM_EWM_SPAN = 10
+FORM_STATS = ['GmSc', 'PTS', 'AST', 'TRB']
+
+# Player similarity: per-game averages compared after standardizing each stat across the league.
+# Shooting percentages are made over attempted shots, from the columns listed with them.
+SIMILARITY_STATS = ['PTS', 'AST', 'TRB', 'MP', 'GmSc', 'FG%', '3P%', 'FT%']
+SIMILARITY_SHOTS = {'FG%': ('FG', 'FGA'), '3P%': ('3P', '3PA'), 'FT%': ('FT', 'FTA')}
+SIMILARITY_MIN_GAMES = 5
 
 # Create Flask app with more permissive static file serving
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins for all routes
 
-def load_and_process_data():
+# Last-run metrics of each pipeline stage, keyed by stage name
+PIPELINE_METRICS = {}
+metrics_lock = threading.Lock()
+
+# Peak memory is sampled from the resident set size in /proc (Linux); elsewhere it is not recorded
+STATM_PATH = '/proc/self/statm'
+MEMORY_SAMPLE_INTERVAL = 0.005
+
+# Memory trackers of the stages currently running, and the thread sampling for them
+active_stages = []
+memory_sampler = None
+
+def resident_bytes():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open(STATM_PATH) as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+def sample_stage_memory():
+    """Raise the peak of every running stage to the current resident size until none is left"""
+    global memory_sampler
+    while True:
+        time.sleep(MEMORY_SAMPLE_INTERVAL)
+        rss = resident_bytes()
+        with metrics_lock:
+            if not active_stages:
+                memory_sampler = None
+                return
+            for tracker in active_stages:
+                tracker['peak'] = max(tracker['peak'], rss)
+
+@contextmanager
+def pipeline_stage(name, input_rows=None):
+    """
+    Record duration, peak memory and row/byte counts of one pipeline stage.
+    
+    Yields a dict the stage can fill in with output_rows and output_bytes. Peak memory
+    is the highest resident set size sampled while the stage runs, minus the size when
+    it started. It is process-wide, so stages running concurrently on threads see each
+    other's allocations.
+    """
+    global memory_sampler
+    stage = {'input_rows': input_rows, 'output_rows': None, 'output_bytes': None}
+    rss = resident_bytes()
+    tracker = {'start': rss, 'peak': rss}
+    if rss is not None:
+        with metrics_lock:
+            active_stages.append(tracker)
+            if memory_sampler is None:
+                memory_sampler = threading.Thread(target=sample_stage_memory, daemon=True)
+                memory_sampler.start()
+    
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield stage
+        failed = False
+    finally:
+        duration = time.perf_counter() - start
+        rss = resident_bytes()
+        with metrics_lock:
+            if tracker['start'] is not None:
+                # Trackers of nested stages can be equal, so remove this one by identity
+                del active_stages[next(i for i, t in enumerate(active_stages) if t is tracker)]
+                tracker['peak'] = max(tracker['peak'], rss)
+            previous = PIPELINE_METRICS.get(name, {})
+            PIPELINE_METRICS[name] = {
+                **stage,
+                'duration_seconds': duration,
+                'peak_memory_bytes': tracker['peak'] - tracker['start'] if tracker['start'] is not None else None,
+                'runs': previous.get('runs', 0) + 1,
+                'failures': previous.get('failures', 0) + failed,
+                'finished': time.time()
+            }
+
+def dump_json(path, data):
+    """Write JSON through a temporary file so readers never see a partially written output"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, cls=CustomJSONEncoder)
+    os.replace(tmp_path, path)
+
+def write_json(path, data):
+    """Write a chart output with dump_json, recorded as a write stage"""
+    with pipeline_stage(f"write:{os.path.basename(path)}") as stage:
+        dump_json(path, data)
+        stage['output_rows'] = len(data) if isinstance(data, list) else None
+        stage['output_bytes'] = os.path.getsize(path)
+
+def encode_columnar(df):
+    """
+    Encode a frame as columnar JSON.
+    
+    Numeric columns become plain arrays, dates become day offsets from the earliest
+    date, and anything else (player and team names) becomes integer codes into a
+    per-column dictionary. control.js's decodeColumnar turns it back into records.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.normalize()
+            start = values.min()
+            days = (values - start).dt.days
+            columns[col] = {
+                'start': start.strftime('%Y-%m-%d') if not pd.isna(start) else None,
+                'days': days.astype(object).where(days.notna(), None).tolist()
+            }
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            columns[col] = values.astype(object).where(values.notna(), None).tolist()
+        else:
+            codes, uniques = pd.factorize(values)
+            columns[col] = {
+                'dict': uniques.tolist(),
+                'codes': [code if code >= 0 else None for code in codes.tolist()]
+            }
+    return {'format': 'columnar', 'length': len(df), 'columns': columns}
+
+def records_json_chunks(df):
+    """
+    Serialize a frame as JSON record arrays of JSON_CHUNK_ROWS rows each, without brackets.
+    
+    Date columns are formatted once per chunk in a vectorized step, and floats keep 15
+    significant digits (to_json's default of 10 would round the stats).
+    """
+    date_cols = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    for start in range(0, len(df), JSON_CHUNK_ROWS):
+        chunk = df.iloc[start:start + JSON_CHUNK_ROWS]
+        if date_cols:
+            chunk = chunk.assign(**{col: chunk[col].dt.strftime('%Y-%m-%d') for col in date_cols})
+        yield chunk.to_json(orient='records', double_precision=15)[1:-1]
+
+def write_records(path, df):
+    """
+    Write a per-game frame as JSON in the configured JSON_FORMAT.
+    
+    The records layout is streamed chunk by chunk, so peak memory depends on
+    JSON_CHUNK_ROWS rather than on the number of rows.
+    """
+    with pipeline_stage(f"write:{os.path.basename(path)}", len(df)) as stage:
+        if JSON_FORMAT == 'columnar':
+            dump_json(path, encode_columnar(df))
+        else:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write('[')
+                for i, chunk in enumerate(records_json_chunks(df)):
+                    f.write(',' + chunk if i else chunk)
+                f.write(']')
+            os.replace(tmp_path, path)
+        stage['output_rows'] = len(df)
+        stage['output_bytes'] = os.path.getsize(path)
+
+def append_records(path, df):
+    """Append rows to a records-layout JSON file in place, without rewriting the existing rows"""
+    if len(df) == 0:
+        return
+    with pipeline_stage(f"append:{os.path.basename(path)}", len(df)) as stage, open(path, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(size - 1)
+        if size < 2 or f.read(1) != b']':
+            raise Exception(f"{path} is not a JSON array")
+        f.seek(size - 2)
+        is_empty = f.read(1) == b'['
+        f.seek(size - 1)
+        f.truncate()
+        for chunk in records_json_chunks(df):
+            f.write((chunk if is_empty else ',' + chunk).encode())
+            is_empty = False
+        f.write(b']')
+        stage['output_rows'] = len(df)
+        stage['output_bytes'] = f.tell()
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_build_manifest():
+    """Load the build manifest, or an empty one if it is missing or unreadable"""
+    try:
+        with open(BUILD_MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'source': None, 'charts': {}}
+    manifest.setdefault('charts', {})
+    return manifest
+
+def save_build_manifest(manifest):
+    """Write the build manifest atomically so a crash never leaves it half-written"""
+    tmp_path = BUILD_MANIFEST + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, BUILD_MANIFEST)
+
+def is_chart_current(manifest, chart, source_hash):
+    """Check whether a chart's output was built from this source by this processor version"""
+    entry = manifest['charts'].get(chart['name'])
+    if not entry:
+        return False
+    if entry.get('version') != chart['version'] or entry.get('source') != source_hash:
+        return False
+    if entry.get('format', 'records') != JSON_FORMAT:
+        return False
+    output_path = os.path.join(DATA_DIR, chart['output'])
+    if not os.path.exists(output_path):
+        return False
+    return file_sha256(output_path) == entry.get('output_hash')
+
+def read_season_csv(csv_path):
+    """Parse a season CSV with explicit dtypes and a normalized Date column"""
+    print(f"Loading data from: {csv_path}")
+    with pipeline_stage(f"parse:{os.path.basename(csv_path)}") as stage:
+        df = pd.read_csv(csv_path, dtype=SEASON_DTYPES)
+        stage['output_rows'] = len(df)
+    
+    # Print dataset info for debugging
+    print(f"Dataset loaded with {len(df)} rows and {len(df.columns)} columns")
+    print("Columns:", df.columns.tolist())
+    
+    if len(df) == 0:
+        raise Exception("Dataset is empty")
+    
+    # Make sure Date is in datetime format
+    date_col = resolve_columns(df.columns).get('Date')
+    if date_col:
+        with pipeline_stage(f"parse_dates:{os.path.basename(csv_path)}", len(df)) as stage:
+            df['Date'] = pd.to_datetime(df[date_col])
+            stage['output_rows'] = int(df['Date'].notna().sum())
+    else:
+        # Create a date column if none exists
+        print("Warning: No date column found, creating synthetic dates")
+        df['Date'] = pd.date_range(start='2023-10-01', periods=len(df), freq='D')
+    
+    return df
+
+def resolve_columns(columns):
+    """Map each canonical column name to the source column that provides it"""
+    by_upper = {}
+    for col in columns:
+        by_upper.setdefault(col.upper(), col)
+    
+    mapping = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        # Prefer an exact (case-insensitive) match on any alias
+        match = next((by_upper[alias.upper()] for alias in aliases if alias.upper() in by_upper), None)
+        if match is None and canonical in FUZZY_COLUMNS:
+            # Fall back to the first column containing one of the aliases
+            match = next((col for alias in aliases for col in columns if alias.upper() in col.upper()), None)
+        if match is not None:
+            mapping[canonical] = match
+    return mapping
+
+def season_cache_path(source_hash):
+    """Path of the columnar cache file for a given source CSV hash"""
+    return os.path.join(CACHE_DIR, f'season-{source_hash[:16]}-v{SEASON_CACHE_VERSION}.feather')
+
+def write_season_cache(df, source_hash):
+    """Write a parsed season to an uncompressed (memory-mappable) Feather file"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache_path = season_cache_path(source_hash)
+    tmp_path = cache_path + '.tmp'
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+    print(f"Season data cached to: {cache_path}")
+
+def prune_season_caches(source_files):
+    """Drop cached seasons for CSVs that are no longer part of the source data"""
+    keep = {season_cache_path(source_file['sha256']) for source_file in source_files}
+    for old_path in glob.glob(os.path.join(CACHE_DIR, 'season-*.feather')):
+        if old_path not in keep:
+            os.remove(old_path)
+
+def load_season_frame(csv_path, source_hash):
+    """
+    Load the parsed season for a source CSV.
+    
+    The first load parses the CSV and caches it as Feather; later loads memory-map
+    the cache and read only the columns the chart processors need.
+    """
+    if feather is None:
+        print("pyarrow not installed, season cache disabled")
+        return read_season_csv(csv_path)
+    
+    cache_path = season_cache_path(source_hash)
+    if os.path.exists(cache_path):
+        with pipeline_stage(f"load_cache:{os.path.basename(csv_path)}") as stage:
+            with ipc.open_file(cache_path) as reader:
+                columns = list(dict.fromkeys(resolve_columns(reader.schema.names).values()))
+            table = feather.read_table(cache_path, columns=columns, memory_map=True)
+            df = table.to_pandas()
+            stage['output_rows'] = len(df)
+        print(f"Loaded cached season data from {cache_path} with {len(df)} rows and {len(columns)} columns")
+        return df
+    
+    df = read_season_csv(csv_path)
+    write_season_cache(df, source_hash)
+    return df
+
+def snapshot_version(name):
+    """Version number of a snapshot directory name such as 'v000012', or None"""
+    if name.startswith('v') and name[1:].isdigit():
+        return int(name[1:])
+    return None
+
+def current_snapshot():
+    """Path of the snapshot data/ points to, or None while data/ is still a plain directory"""
+    if not os.path.islink(DATA_DIR):
+        return None
+    return os.path.join(os.path.dirname(DATA_DIR), os.readlink(DATA_DIR))
+
+def adopt_data_dir():
+    """Move a plain data/ directory (from before snapshots existed) into the first snapshot"""
+    if os.path.islink(DATA_DIR) or not os.path.isdir(DATA_DIR):
+        return
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    first = os.path.join(SNAPSHOTS_DIR, f'v{0:06d}')
+    os.rename(DATA_DIR, first)
+    os.symlink(os.path.relpath(first, os.path.dirname(os.path.abspath(DATA_DIR))), DATA_DIR)
+    print(f"Moved {DATA_DIR}/ into snapshot {first}")
+
+def create_snapshot(link=True):
+    """
+    Create the next snapshot directory, holding the current snapshot's files.
+    
+    With link=True the files are hard links, which is enough for outputs that are only
+    ever replaced (the writers write a temporary file and rename it). Pass link=False
+    for outputs that will be modified in place, such as appended records files.
+    """
+    adopt_data_dir()
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    versions = [snapshot_version(name) for name in os.listdir(SNAPSHOTS_DIR)]
+    version = max([v for v in versions if v is not None], default=0) + 1
+    while True:
+        # mkdir fails if another process claimed the same version first
+        staging = os.path.join(SNAPSHOTS_DIR, f'v{version:06d}')
+        try:
+            os.mkdir(staging)
+            break
+        except FileExistsError:
+            version += 1
+    
+    current = current_snapshot()
+    for name in os.listdir(current) if current else []:
+        src = os.path.join(current, name)
+        if not os.path.isfile(src) or name.endswith('.tmp'):
+            continue
+        if link:
+            try:
+                os.link(src, os.path.join(staging, name))
+                continue
+            except OSError:
+                pass
+        shutil.copy2(src, os.path.join(staging, name))
+    return staging
+
+def unshare_file(path):
+    """Replace a hard-linked snapshot file with a copy of its own, so it can be modified in place"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.copy2(path, tmp_path)
+    os.replace(tmp_path, path)
+
+def content_encodings():
+    """Compressed encodings available for data files, preferred first"""
+    return [encoding for encoding in COMPRESSED_SUFFIXES if encoding != 'br' or brotli is not None]
+
+def compress_payload(body, encoding, level=None):
+    """
+    Compress bytes with 'br' or 'gzip', at BROTLI_QUALITY or GZIP_LEVEL unless a level is given.
+    The gzip header carries no timestamp, so output is reproducible.
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    return gzip.compress(body, GZIP_LEVEL if level is None else level, mtime=0)
+
+def is_compressed_current(path, encoding):
+    """Whether the compressed copy of a file exists and is newer than the file"""
+    compressed_path = path + COMPRESSED_SUFFIXES[encoding]
+    return (os.path.exists(compressed_path)
+            and os.stat(compressed_path).st_mtime_ns >= os.stat(path).st_mtime_ns)
+
+def precompress_snapshot(snapshot_dir, levels=None):
+    """
+    Write compressed copies of every JSON output in a snapshot that lacks an up-to-date one,
+    at the default levels or those in levels ({encoding: level})
+    """
+    with pipeline_stage('compress') as stage:
+        written = 0
+        for path in sorted(glob.glob(os.path.join(snapshot_dir, '*.json'))):
+            body = None
+            for encoding in content_encodings():
+                if is_compressed_current(path, encoding):
+                    continue
+                if body is None:
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                compressed_path = path + COMPRESSED_SUFFIXES[encoding]
+                tmp_path = f"{compressed_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    written += f.write(compress_payload(body, encoding, (levels or {}).get(encoding)))
+                os.replace(tmp_path, compressed_path)
+        stage['output_bytes'] = written
+
+def swap_snapshot(staging, compression=None):
+    """
+    Precompress a finished snapshot (at the compression levels given, if any), point data/ at it
+    in one atomic rename, then prune old snapshots
+    """
+    precompress_snapshot(staging, compression)
+    tmp_link = f"{DATA_DIR}.{os.getpid()}.link"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(staging, os.path.dirname(os.path.abspath(DATA_DIR))), tmp_link)
+    os.replace(tmp_link, DATA_DIR)
+    print(f"Serving snapshot {staging}")
+    
+    # Keep a few older snapshots so readers that opened a file just before the swap can finish
+    snapshots = sorted((name for name in os.listdir(SNAPSHOTS_DIR) if snapshot_version(name) is not None),
+                       key=snapshot_version)
+    current = os.path.basename(staging)
+    older = [name for name in snapshots if snapshot_version(name) < snapshot_version(current)]
+    for name in older[:max(len(older) - (SNAPSHOTS_KEPT - 1), 0)]:
+        shutil.rmtree(os.path.join(SNAPSHOTS_DIR, name), ignore_errors=True)
+
+def discard_snapshot(staging):
+    """Remove a snapshot that was never swapped in"""
+    shutil.rmtree(staging, ignore_errors=True)
+
+def run_chart_processor(chart, season, out_dir):
+    """Run one chart processor as a pipeline stage and return its wall time in seconds"""
+    start = time.perf_counter()
+    with pipeline_stage(f"process:{chart['name']}", len(season.frame)) as stage:
+        chart['process'](season, out_dir)
+        stage['output_bytes'] = os.path.getsize(os.path.join(out_dir, chart['output']))
+    return time.perf_counter() - start
+
+def read_shared_feather(path, columns=None):
+    """
+    Memory-map a Feather file written for process workers, converting only the given columns.
+    
+    Each column becomes its own pandas block, so numeric columns without missing values
+    can point at the mapped file instead of being copied.
+    """
+    table = feather.read_table(path, memory_map=True)
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.column_names])
+    return table.to_pandas(split_blocks=True)
+
+def run_chart_from_feather(chart_name, frame_path, table_paths, out_dir, json_format):
+    """
+    Process-pool entry point: memory-map the shared frame and tables and run one chart processor.
+    
+    Only the columns and derived tables the chart lists are loaded. Returns the wall time
+    and the stage metrics recorded in this worker, which the parent merges into its own
+    PIPELINE_METRICS.
+    """
+    global JSON_FORMAT
+    JSON_FORMAT = json_format
+    PIPELINE_METRICS.clear()
+    chart = next(chart for chart in CHART_PROCESSORS if chart['name'] == chart_name)
+    season = SeasonData(read_shared_feather(frame_path, chart['columns']))
+    for name in chart['tables']:
+        setattr(season, name, read_shared_feather(table_paths[name]))
+    return run_chart_processor(chart, season, out_dir), dict(PIPELINE_METRICS)
+
+def merge_stage_metrics(stages):
+    """Add stage metrics recorded in a worker process to PIPELINE_METRICS"""
+    with metrics_lock:
+        for name, metrics in stages.items():
+            previous = PIPELINE_METRICS.get(name, {})
+            PIPELINE_METRICS[name] = {
+                **metrics,
+                'runs': previous.get('runs', 0) + metrics['runs'],
+                'failures': previous.get('failures', 0) + metrics['failures']
+            }
+
+def run_chart_processors(season, charts, workers=1, executor='thread', out_dir=DATA_DIR, on_done=None):
+    """
+    Run chart processors, concurrently when workers > 1.
+    
+    Thread workers share the season (and its derived tables) in memory. Process workers memory-map a
+    Feather copy of it from the cache directory instead of unpickling their own copy, and load only
+    the columns their chart lists. Derived tables listed by the charts are built once here and
+    shared the same way, rather than rebuilt in every worker that needs them.
+    on_done, if given, is called with each chart's name as it finishes or fails.
+    Returns (timings, errors) keyed by chart name; a failing processor does not stop the others.
+    """
+    timings = {}
+    errors = {}
+    
+    if workers <= 1:
+        for chart in charts:
+            print(f"Processing data for {chart['label']}...")
+            try:
+                timings[chart['name']] = run_chart_processor(chart, season, out_dir)
+            except Exception as e:
+                print(f"Error processing {chart['label']}: {e}")
+                errors[chart['name']] = e
+            if on_done:
+                on_done(chart['name'])
+        return timings, errors
+    
+    if executor == 'process' and feather is None:
+        print("pyarrow not installed, using thread workers instead of processes")
+        executor = 'thread'
+    
+    if executor == 'process':
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        frame_path = os.path.join(CACHE_DIR, 'normalized.feather')
+        feather.write_feather(season.frame.reset_index(drop=True), frame_path, compression='uncompressed')
+        table_paths = {}
+        for name in dict.fromkeys(name for chart in charts for name in chart['tables']):
+            table_paths[name] = os.path.join(CACHE_DIR, f'{name}.feather')
+            feather.write_feather(getattr(season, name).reset_index(drop=True), table_paths[name],
+                                  compression='uncompressed')
+        # Workers must not be forked: this process runs request, sampler and rebuild threads, and a
+        # child forked while one of them holds a lock (metrics_lock) would deadlock on it
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+        submit = lambda chart: pool.submit(run_chart_from_feather, chart['name'], frame_path, table_paths,
+                                           out_dir, JSON_FORMAT)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda chart: pool.submit(run_chart_processor, chart, season, out_dir)
+    
+    print(f"Processing {len(charts)} charts with {workers} {executor} workers...")
+    with pool:
+        futures = {submit(chart): chart for chart in charts}
+        for future in as_completed(futures):
+            chart = futures[future]
+            try:
+                if executor == 'process':
+                    timings[chart['name']], stages = future.result()
+                    merge_stage_metrics(stages)
+                else:
+                    timings[chart['name']] = future.result()
+                print(f"Processed data for {chart['label']}")
+            except Exception as e:
+                print(f"Error processing {chart['label']}: {e}")
+                errors[chart['name']] = e
+            if on_done:
+                on_done(chart['name'])
+    
+    return timings, errors
+
+def describe_source(csv_files):
+    """Source description for the manifest: each CSV with its hash, plus one hash over all of them"""
+    files = [{'path': path, 'sha256': file_sha256(path)} for path in sorted(csv_files)]
+    combined = hashlib.sha256(''.join(source_file['sha256'] for source_file in files).encode()).hexdigest()
+    return {'files': files, 'sha256': combined}
+
+def load_full_frame(source, increments):
+    """Parsed rows of every source CSV (via the season cache), followed by any ingested increments"""
+    # Manifests written before multi-file sources described a single CSV
+    source_files = source.get('files') or [source]
+    frames = [load_season_frame(source_file['path'], source_file['sha256']) for source_file in source_files]
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if increments:
+        parts = [pd.read_pickle(increment['path']) for increment in increments]
+        print(f"Adding {sum(len(part) for part in parts)} rows from {len(parts)} ingested increments")
+        df = pd.concat([df] + [part[[col for col in df.columns if col in part.columns]] for part in parts],
+                       ignore_index=True)
+    return df
+
+def manifest_chart_entry(chart, source_hash, out_dir=DATA_DIR):
+    """Build manifest entry of a chart just written to out_dir"""
+    return {
+        'version': chart['version'],
+        'format': JSON_FORMAT,
+        'source': source_hash,
+        'output': chart['output'],
+        'output_hash': file_sha256(os.path.join(out_dir, chart['output']))
+    }
+
+def source_chunks(source, increments, chunk_rows):
+    """
+    Normalized chunks of every source CSV, followed by the ingested increments.
+    
+    The CSVs are parsed chunk_rows rows at a time. Only the first chunk reports its column mapping.
+    """
+    source_files = source.get('files') or [source]
+    first = True
+    for path in [source_file['path'] for source_file in source_files]:
+        print(f"Streaming data from: {path}")
+        for chunk in pd.read_csv(path, dtype=SEASON_DTYPES, chunksize=chunk_rows):
+            date_col = resolve_columns(chunk.columns).get('Date')
+            if date_col is None:
+                raise Exception(f"Streaming builds need a date column, none found in {path}")
+            chunk['Date'] = pd.to_datetime(chunk[date_col])
+            yield normalize_frame(chunk, verbose=first)
+            first = False
+    for increment in increments:
+        yield normalize_frame(pd.read_pickle(increment['path']), verbose=first)
+        first = False
+
+class StreamingRecordsFile:
+    """
+    A records-layout JSON output written a chunk of rows at a time.
+    
+    Rows go to a temporary file that replaces the output on close(), so a file hard-linked
+    from the previous snapshot is never modified in place.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.file = open(self.tmp_path, 'w')
+        self.file.write('[')
+        self.rows = 0
+    
+    def write(self, df):
+        for chunk in records_json_chunks(df):
+            self.file.write(',' + chunk if self.rows else chunk)
+            self.rows += 1
+    
+    def close(self):
+        self.file.write(']')
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+def stream_chart_outputs(source, increments, charts, out_dir, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Build chart outputs from the source CSVs in two streaming passes, with memory bounded by chunk_rows.
+    
+    The first pass keeps running per-season, per-player sums and counts and per-team, per-date
+    totals; these grow with the number of players, teams and dates, not rows. They settle which
+    season is charted, the MVP-qualified players and the top scorers. The second pass appends
+    the charted rows of those players to the per-game outputs and keeps the rows of the trade
+    impact players. The outputs match those of the in-memory processors, up to floating-point
+    summation order. Returns the incremental aggregate state for the charted season.
+    """
+    if JSON_FORMAT != 'records':
+        raise Exception("Streaming builds write the records JSON layout only")
+    
+    with pipeline_stage('stream_aggregate') as stage:
+        player_sums = None
+        team_days = None
+        rows = 0
+        for chunk in source_chunks(source, increments, chunk_rows):
+            rows += len(chunk)
+            # Rows without a date have no season; they count as their own (empty) season key
+            grouped = chunk.groupby([chunk['Season'].fillna(''), 'Player'])
+            sums = grouped[STREAM_PLAYER_STATS].sum().join(grouped['PTS'].count().rename('PTS_count'))
+            sums.insert(0, 'games', grouped.size())
+            player_sums = sums if player_sums is None else player_sums.add(sums, fill_value=0)
+            if 'Tm' in chunk.columns:
+                days = aggregate_team_days(chunk)
+                team_days = days if team_days is None else merge_team_days(team_days, days)
+        stage['input_rows'] = rows
+        stage['output_rows'] = len(player_sums)
+    
+    # Chart the latest season, or every row when there is only one season (see build_season_data)
+    seasons = player_sums.index.get_level_values(0).unique()
+    dated_seasons = [season for season in seasons if season]
+    latest = max(dated_seasons) if dated_seasons else ''
+    charted = set(seasons) if len(dated_seasons) <= 1 else {latest}
+    if len(dated_seasons) > 1:
+        print(f"Streamed {len(dated_seasons)} seasons, charts use {latest}")
+    
+    players = player_sums[player_sums.index.get_level_values(0).isin(charted)].groupby(level='Player').sum()
+    players['games'] = players['games'].astype(int)
+    qualified = set(mvp_qualified_players(players['games']))
+    top_scorers = set(top_scoring_players(players['PTS'] / players['PTS_count'], players['games'], 10).index)
+    # Every spelling of the trade impact players, so the second pass can match rows with isin
+    trade_keys = {fold_name(player) for player in TRADE_IMPACT_PLAYERS}
+    trade_names = [name for name in player_sums.index.get_level_values('Player').unique()
+                   if fold_name(name) in trade_keys]
+    
+    chart_names = {chart['name'] for chart in charts}
+    labels = {chart['name']: chart['label'] for chart in charts}
+    outputs = {}
+    if 'mvp' in chart_names:
+        outputs['mvp'] = (['Player', 'Date', 'PTS', 'AST', 'TRB', 'GmSc'], lambda rows: rows['Player'].isin(qualified))
+    if 'scoring' in chart_names:
+        outputs['scoring'] = (['Player', 'Date', 'PTS'], lambda rows: rows['Player'].isin(top_scorers))
+    if 'bench' in chart_names:
+        outputs['bench'] = (['Player', 'Tm', 'PTS', 'MP', 'GmSc'], None)
+    paths = {chart['name']: os.path.join(out_dir, chart['output']) for chart in charts}
+    
+    with pipeline_stage('stream_write') as stage:
+        files = {name: StreamingRecordsFile(paths[name]) for name in outputs}
+        trade_rows = []
+        try:
+            for chunk in source_chunks(source, increments, chunk_rows):
+                rows = chunk[chunk['Season'].fillna('').isin(charted)]
+                for name, (columns, select) in outputs.items():
+                    require_columns(rows, columns, labels[name])
+                    files[name].write(rows.loc[select(rows), columns] if select else rows[columns])
+                trade_rows.append(chunk[chunk['Player'].isin(trade_names)])
+            for records in files.values():
+                records.close()
+        finally:
+            for records in files.values():
+                if not records.file.closed:
+                    records.file.close()
+                    os.remove(records.tmp_path)
+        stage['output_bytes'] = sum(os.path.getsize(paths[name]) for name in files)
+    
+    if 'championship' in chart_names:
+        if team_days is None:
+            raise Exception("Missing required columns for championship chart: ['Tm']")
+        logs = team_game_logs(team_days)
+        champ_data = championship_table(summarize_teams(logs[logs['Season'].fillna('').isin(charted)]))
+        write_json(paths['championship'], champ_data.to_dict(orient='records'))
+    
+    trade_frame = pd.concat(trade_rows, ignore_index=True)
+    if 'trade_impact' in chart_names:
+        # The trade players' rows, with the team totals of the whole history
+        process_trade_impact_data(trade_impact_season(trade_frame, team_days), out_dir)
+    
+    charted_days = (team_days[season_labels(team_days['Date']).fillna('').isin(charted).to_numpy()]
+                    .reset_index(drop=True) if team_days is not None else None)
+    return {
+        'season': latest or None,
+        'players': players[['games'] + STREAM_PLAYER_STATS],
+        'team_days': charted_days,
+        'trade_rows': trade_frame[trade_frame['Season'].fillna('').isin(charted)].reset_index(drop=True)
+    }
+
+def load_and_process_data(force=False, workers=1, executor='thread', stream=False, chunk_rows=STREAM_CHUNK_ROWS):
     """
     Load NBA dataset from Kaggle and process it into the required JSON files for visualization.
+
+    Charts whose source CSV, processor version and output file are unchanged since the
+    last build (according to the build manifest) are skipped. If every chart is current,
+    the CSV is never parsed. Pass force=True to rebuild everything, and workers > 1 to
+    run the chart processors concurrently on thread or process workers. With stream=True
+    the CSVs are read chunk_rows rows at a time by stream_chart_outputs instead of being
+    loaded whole, for sources larger than memory.
+    
+    Charts are written into a new snapshot directory, which data/ is switched to only
+    once every processor has finished, so readers never see a partially built data/.
     """
+    staging = None
     try:
         # Download the dataset from Kaggle
         print("Downloading NBA dataset from Kaggle...")
-        dataset_path = kagglehub.dataset_download("eduardopalmieri/nba-player-stats-season-2425")
+        set_rebuild_status(phase='download')
+        with pipeline_stage('download'):
+            dataset_path = kagglehub.dataset_download("eduardopalmieri/nba-player-stats-season-2425")
         print(f"Dataset downloaded to: {dataset_path}")
         
         # Find all CSV files in the downloaded dataset
@@ -45,452 +946,1188 @@ def load_and_process_data():
         
         print(f"Found {len(csv_files)} CSV files: {csv_files}")
         
-        # Load the first CSV file (assuming it's the main dataset)
-        main_csv = csv_files[0]
-        print(f"Loading data from: {main_csv}")
-        df = pd.read_csv(main_csv)
+        # Every CSV is loaded; each one may hold one or more seasons
+        with pipeline_stage('hash_source') as stage:
+            source = describe_source(csv_files)
+            stage['output_bytes'] = sum(os.path.getsize(path) for path in csv_files)
+        source_hash = source['sha256']
         
-        # Print dataset info for debugging
-        print(f"Dataset loaded with {len(df)} rows and {len(df.columns)} columns")
-        print("Columns:", df.columns.tolist())
+        # Work out which charts actually need rebuilding
+        manifest = load_build_manifest()
         
-        if len(df) == 0:
-            raise Exception("Dataset is empty")
+        # Rows ingested on top of an older source are assumed to be part of the new one
+        if (manifest.get('source') or {}).get('sha256') != source_hash and manifest.get('increments'):
+            print("Source data changed, dropping previously ingested increments")
+            for increment in manifest['increments']:
+                if os.path.exists(increment['path']):
+                    os.remove(increment['path'])
+            manifest['increments'] = []
+        increments = manifest.get('increments', [])
+        # Pruning happens here on the build path only; loading a season for the API has no side effects
+        prune_season_caches(source['files'])
+        stale_charts = [chart for chart in CHART_PROCESSORS
+                        if force or not is_chart_current(manifest, chart, source_hash)]
         
-        # Make sure Date is in datetime format
-        if 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date'])
-        else:
-            # If 'Date' column doesn't exist, try to find alternative date column
-            date_cols = [col for col in df.columns if 'date' in col.lower()]
-            if date_cols:
-                df['Date'] = pd.to_datetime(df[date_cols[0]])
-            else:
-                # Create a date column if none exists
-                print("Warning: No date column found, creating synthetic dates")
-                df['Date'] = pd.date_range(start='2023-10-01', periods=len(df), freq='D')
+        if not stale_charts:
+            print("Build cache is up to date, skipping data processing")
+            return
         
-        # Process data for each visualization
-        print("Processing data for MVP Chart...")
-        process_mvp_data(df)
+        print(f"Charts to rebuild: {[chart['name'] for chart in stale_charts]}")
+        set_rebuild_status(phase='load', charts_total=len(stale_charts), charts_done=0)
+        if stream:
+            staging = create_snapshot()
+            set_rebuild_status(phase='process', snapshot=snapshot_version(os.path.basename(staging)))
+            build_start = time.perf_counter()
+            state = stream_chart_outputs(source, increments, stale_charts, staging, chunk_rows)
+            build_time = time.perf_counter() - build_start
+            
+            # The manifest is saved before the swap, so a server that sees the new snapshot
+            # loads the data it was built from (see get_current_season)
+            manifest['source'] = source
+            for chart in stale_charts:
+                manifest['charts'][chart['name']] = manifest_chart_entry(chart, source_hash, staging)
+            save_build_manifest(manifest)
+            set_rebuild_status(phase='swap', charts_done=len(stale_charts))
+            swap_snapshot(staging)
+            staging = None
+            print(f"Streamed {len(stale_charts)} charts in {build_time:.3f}s")
+            
+            save_aggregate_state({'source': source_hash,
+                                  'increments': [increment['sha256'] for increment in increments],
+                                  **state})
+            # The API loads the full frame lazily, only if it is queried
+            set_current_season(None)
+            print("All data processed successfully!")
+            return
+        
+        with pipeline_stage('load_frame') as stage:
+            df = load_full_frame(source, increments)
+            stage['output_rows'] = len(df)
+        with pipeline_stage('normalize', len(df)) as stage:
+            df = normalize_frame(df)
+            stage['output_rows'] = len(df)
+        with pipeline_stage('season_data', len(df)) as stage:
+            season = build_season_data(df)
+            stage['output_rows'] = len(season.frame)
+        del df
         
-        print("Processing data for Championship Chart...")
-        process_championship_data(df)
+        # Process data for each stale visualization into a new snapshot; unchanged charts
+        # (and failed ones) keep their previous output
+        staging = create_snapshot()
+        set_rebuild_status(phase='process', snapshot=snapshot_version(os.path.basename(staging)))
+        build_start = time.perf_counter()
+        done = []
+        def chart_done(name):
+            done.append(name)
+            set_rebuild_status(charts_done=len(done))
+        timings, errors = run_chart_processors(season, stale_charts, workers, executor,
+                                               out_dir=staging, on_done=chart_done)
+        build_time = time.perf_counter() - build_start
         
-        print("Processing data for Scoring Leader Chart...")
-        process_scoring_data(df)
+        # Record every chart that completed in the manifest, even if another one failed.
+        # It is saved before the swap, like in the streaming build.
+        manifest['source'] = source
+        for chart in stale_charts:
+            if chart['name'] in timings:
+                manifest['charts'][chart['name']] = manifest_chart_entry(chart, source_hash, staging)
+        save_build_manifest(manifest)
         
-        print("Processing data for Bench Strength Chart...")
-        process_bench_data(df)
+        set_rebuild_status(phase='swap')
+        swap_snapshot(staging)
+        staging = None
         
-        print("Processing data for Trade Impact Chart...")
-        process_trade_impact_data(df)
+        print("Processor timings:")
+        for chart in stale_charts:
+            if chart['name'] in timings:
+                print(f"  {chart['name']:<14} {timings[chart['name']]:.3f}s")
+            else:
+                print(f"  {chart['name']:<14} failed")
+        print(f"  {'total':<14} {build_time:.3f}s")
         
+        if errors:
+            raise Exception(f"Chart processors failed: {', '.join(errors)}")
+        
+        save_aggregate_state(build_aggregate_state(season, source_hash, increments))
+        set_current_season(season)
         print("All data processed successfully!")
         
     except Exception as e:
         print(f"Error processing data: {e}")
         print(f"Stack trace: {sys.exc_info()}")
+        if staging:
+            discard_snapshot(staging)
         raise Exception(f"Failed to process data: {e}")
 
-def process_mvp_data(df):
-    """Process data for the MVP prediction chart"""
-    # Verify column names and adapt to the actual dataset
-    required_cols = ['Player', 'Date', 'PTS', 'AST', 'TRB']
-    
-    # Map dataset column names to our expected column names
-    col_mapping = {}
-    for req_col in required_cols:
-        # Find matching column (case insensitive)
-        matches = [col for col in df.columns if col.upper() == req_col.upper()]
-        if matches:
-            col_mapping[req_col] = matches[0]
-        else:
-            # Look for similar column names
-            similar = [col for col in df.columns if req_col.upper() in col.upper()]
-            if similar:
-                col_mapping[req_col] = similar[0]
+# Progress of the current or last rebuild, reported by /api/status
+rebuild_status = {'state': 'idle'}
+rebuild_status_lock = threading.Lock()
+rebuild_thread = None
+
+def set_rebuild_status(**fields):
+    """Update the reported rebuild progress"""
+    with rebuild_status_lock:
+        rebuild_status.update(fields)
+
+def run_rebuild(**build_args):
+    """Run load_and_process_data and record how it went in rebuild_status"""
+    start = time.perf_counter()
+    with rebuild_status_lock:
+        rebuild_status.clear()
+        rebuild_status.update({'state': 'running', 'phase': 'start', 'started': time.time()})
+    try:
+        load_and_process_data(**build_args)
+        # Load the new snapshot into memory now rather than on the next request
+        get_served_files()
+        set_rebuild_status(state='succeeded')
+    except Exception as e:
+        set_rebuild_status(state='failed', error=str(e))
+    finally:
+        set_rebuild_status(phase=None, finished=time.time(), duration_seconds=time.perf_counter() - start)
+
+def start_background_rebuild(**build_args):
+    """
+    Rebuild on a background thread while the current snapshot keeps being served.
     
-    print(f"Column mapping for MVP data: {col_mapping}")
+    Returns False if a rebuild is already running.
+    """
+    global rebuild_thread
+    with rebuild_status_lock:
+        if rebuild_thread is not None and rebuild_thread.is_alive():
+            return False
+        rebuild_thread = threading.Thread(target=run_rebuild, kwargs=build_args, name='rebuild', daemon=True)
+        rebuild_thread.start()
+    return True
+
+def player_totals(df):
+    """Per-player games and stat sums, which can simply be added together across batches of rows"""
+    totals = df.groupby('Player', observed=True)[['PTS', 'AST', 'TRB', 'GmSc']].sum()
+    totals.insert(0, 'games', df.groupby('Player', observed=True).size())
+    return totals
+
+def trade_player_rows(df):
+    """Rows of the TRADE_IMPACT_PLAYERS under any spelling of their names"""
+    trade_keys = {fold_name(player) for player in TRADE_IMPACT_PLAYERS}
+    names = [name for name in df['Player'].dropna().unique() if fold_name(name) in trade_keys]
+    return df[df['Player'].isin(names)]
+
+def trade_impact_season(trade_rows, team_days):
+    """
+    SeasonData of just the trade impact players' rows, with team totals computed elsewhere,
+    which is all process_trade_impact_data needs
+    """
+    season = SeasonData(trade_rows.reset_index(drop=True))
+    season.team_days = team_days if team_days is not None else aggregate_team_days(trade_rows)
+    return season
+
+def build_aggregate_state(season, source_hash, increments):
+    """Aggregates kept between incremental ingests for a given source and set of increments"""
+    return {
+        'source': source_hash,
+        'increments': [increment['sha256'] for increment in increments],
+        # Season may be an unordered categorical in a compact frame
+        'season': season.frame['Season'].dropna().astype(str).max(),
+        'players': player_totals(season.frame),
+        'team_days': season.team_aggregates[1],
+        'trade_rows': trade_player_rows(season.frame).reset_index(drop=True)
+    }
+
+def save_aggregate_state(state):
+    """Persist the incremental aggregate state next to the season cache"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = AGGREGATE_STATE + '.tmp'
+    pd.to_pickle(state, tmp_path)
+    os.replace(tmp_path, AGGREGATE_STATE)
+
+def load_aggregate_state(manifest):
+    """Load the aggregate state, or None if it is missing or was built from different data"""
+    try:
+        state = pd.read_pickle(AGGREGATE_STATE)
+    except (OSError, ValueError):
+        return None
+    if state.get('source') != manifest['source']['sha256']:
+        return None
+    if state.get('increments') != [increment['sha256'] for increment in manifest.get('increments', [])]:
+        return None
+    if 'trade_rows' not in state:
+        return None
+    return state
+
+def top_scorer_names(totals, n=10):
+    """Names of the top scorers according to per-player totals"""
+    return set(top_scoring_players(totals['PTS'] / totals['games'], totals['games'], n).index)
+
+def ingest_games(csv_path, verify=False):
+    """
+    Add a file of new game rows to the built season without a full rebuild.
+    
+    Only the aggregates and outputs the new rows touch are updated. The championship
+    chart is recomputed from per-team totals. The bench chart gets the new rows appended.
+    The MVP and scoring charts get their new rows appended unless the set of qualified
+    players or top scorers changed, in which case they are regenerated. The trade impact
+    chart is rebuilt from its players' rows and the team totals kept in the aggregate state,
+    only if the new rows involve its players or teams after the trade date.
+    Pass verify=True to compare the result with a full rebuild.
+    """
+    start_time = time.perf_counter()
+    manifest = load_build_manifest()
+    if not manifest.get('source'):
+        raise Exception("No data has been built yet; run a full build before ingesting")
+    source_hash = manifest['source']['sha256']
+    increments = manifest.setdefault('increments', [])
+    
+    increment_hash = file_sha256(csv_path)
+    if any(increment['sha256'] == increment_hash for increment in increments):
+        print(f"{csv_path} has already been ingested")
+        return
+    
+    new_rows = read_season_csv(csv_path)
+    new_frame = normalize_frame(new_rows)
+    state = load_aggregate_state(manifest)
+    
+    # Keep the new rows alongside the season cache so full rebuilds include them
+    os.makedirs(INCREMENTS_DIR, exist_ok=True)
+    increment_path = os.path.join(INCREMENTS_DIR, f'{increment_hash[:16]}.pkl')
+    new_rows.to_pickle(increment_path)
+    increments.append({'path': increment_path, 'sha256': increment_hash, 'rows': len(new_rows)})
     
-    # Check if we have all required columns or suitable replacements
-    if not all(col in col_mapping for col in required_cols):
-        missing = [col for col in required_cols if col not in col_mapping]
-        raise Exception(f"Missing required columns for MVP chart: {missing}")
+    # The full season is only loaded if some output has to be regenerated from scratch
+    full_season = None
+    def get_full_season():
+        nonlocal full_season
+        if full_season is None:
+            full_season = build_season_data(normalize_frame(load_full_frame(manifest['source'], increments)))
+        return full_season
     
-    # Select and rename relevant columns
-    mvp_df = df[[col_mapping[col] for col in required_cols if col in col_mapping]].copy()
-    mvp_df.columns = [col for col in required_cols if col in col_mapping]
+    # Rows from a new season change which season the charts describe, so rebuild everything
+    if state is not None and (new_frame['Season'] != state['season']).any():
+        print("New rows belong to a different season, running a full rebuild")
+        save_build_manifest(manifest)
+        load_and_process_data(force=True)
+        return
     
-    # Check for Game Score column, or calculate it if missing
-    if 'GmSc' in df.columns:
-        mvp_df['GmSc'] = df['GmSc']
+    if state is None:
+        print("Aggregate state is missing or stale, rebuilding it from the full season")
+        state = build_aggregate_state(get_full_season(), source_hash, increments)
+        old_players = None
     else:
-        # Simplified Game Score formula if original not available
-        # Actual GmSc = PTS + 0.4 * FG - 0.7 * FGA - 0.4*(FTA - FT) + 0.7 * ORB + 0.3 * DRB + STL + 0.7 * AST + 0.7 * BLK - 0.4 * PF - TOV
-        print("Game Score column not found, calculating simplified version")
-        mvp_df['GmSc'] = mvp_df['PTS'] * 0.5 + mvp_df['AST'] * 0.7 + mvp_df['TRB'] * 0.3
+        old_players = state['players']
+        state['players'] = old_players.add(player_totals(new_frame), fill_value=0)
+        state['players']['games'] = state['players']['games'].astype(int)
+        state['team_days'] = merge_team_days(state['team_days'], aggregate_team_days(new_frame))
+        state['trade_rows'] = pd.concat([state['trade_rows'], trade_player_rows(new_frame)], ignore_index=True)
+        state['increments'].append(increment_hash)
     
-    # Filter out players with too few games
-    player_game_counts = mvp_df['Player'].value_counts()
-    min_games = max(5, player_game_counts.quantile(0.75) // 2)  # Adaptive threshold
-    qualified_players = player_game_counts[player_game_counts >= min_games].index
-    mvp_df = mvp_df[mvp_df['Player'].isin(qualified_players)]
+    touched_players = new_frame['Player'].unique()
+    touched_teams = new_frame['Tm'].unique() if 'Tm' in new_frame.columns else []
+    touched_dates = new_frame['Date'].dt.strftime('%Y-%m-%d').unique()
+    print(f"Ingesting {len(new_frame)} rows touching {len(touched_players)} players, "
+          f"{len(touched_teams)} teams and {len(touched_dates)} dates")
     
-    # Convert to JSON and save
-    mvp_data = mvp_df.to_dict(orient='records')
+    # Outputs are updated in a new snapshot of hard links to the current one and swapped in
+    # once all of them are done. Only files that are appended to are copied first, and only
+    # the outputs that changed are hashed and recompressed.
+    staging = create_snapshot()
+    try:
+        charts = {chart['name']: chart for chart in CHART_PROCESSORS}
+        changed = set()
+        def can_append(name):
+            entry = manifest['charts'].get(name, {})
+            return (JSON_FORMAT == 'records' and entry.get('format', 'records') == 'records'
+                    and os.path.exists(os.path.join(staging, charts[name]['output'])))
+        def append(name, rows):
+            path = os.path.join(staging, charts[name]['output'])
+            unshare_file(path)
+            append_records(path, rows)
+            changed.add(name)
+        def regenerate(name):
+            print(f"Regenerating {charts[name]['label']} from the full season")
+            charts[name]['process'](get_full_season(), staging)
+            changed.add(name)
+        
+        # Championship chart straight from the merged team totals
+        champ_data = championship_table(summarize_teams(team_game_logs(state['team_days']))).to_dict(orient='records')
+        write_json(os.path.join(staging, charts['championship']['output']), champ_data)
+        changed.add('championship')
+        
+        # MVP chart: append unless the qualified set changed
+        qualified = set(mvp_qualified_players(state['players']['games']))
+        if (old_players is not None and can_append('mvp')
+                and qualified == set(mvp_qualified_players(old_players['games']))):
+            append('mvp', new_frame.loc[new_frame['Player'].isin(qualified),
+                                        ['Player', 'Date', 'PTS', 'AST', 'TRB', 'GmSc']])
+        else:
+            regenerate('mvp')
+        
+        # Scoring chart: append unless the top scorers changed
+        top_scorers = top_scorer_names(state['players'])
+        if old_players is not None and can_append('scoring') and top_scorers == top_scorer_names(old_players):
+            append('scoring', new_frame.loc[new_frame['Player'].isin(top_scorers), ['Player', 'Date', 'PTS']])
+        else:
+            regenerate('scoring')
+        
+        # Bench chart lists every row, so new rows are always appended
+        if old_players is not None and can_append('bench'):
+            append('bench', new_frame[['Player', 'Tm', 'PTS', 'MP', 'GmSc']])
+        else:
+            regenerate('bench')
+        
+        # Trade impact chart only depends on its players' and their teams' games in the rest of
+        # the trade's season. New rows are all in the charted season, so when they fall there the
+        # chart is rebuilt from the trade players' rows and the team totals kept in the state.
+        trade_date = pd.Timestamp(TRADE_IMPACT_DATE)
+        trade_teams = list(TRADE_IMPACT_PLAYERS.values())
+        involved = new_frame['Player'].isin(trade_player_rows(new_frame)['Player'].unique())
+        for col in ('Tm', 'Opp'):
+            if col in new_frame.columns:
+                involved |= new_frame[col].isin(trade_teams)
+        in_window = new_frame['Date'].between(trade_date, season_bounds(trade_date)[1])
+        if (involved & in_window).any():
+            print(f"Updating {charts['trade_impact']['label']} from its players' rows")
+            process_trade_impact_data(trade_impact_season(state['trade_rows'], state['team_days']), staging)
+            changed.add('trade_impact')
+        
+        for name in changed:
+            chart = charts[name]
+            manifest['charts'].setdefault(name, {'version': chart['version'], 'format': JSON_FORMAT,
+                                                 'source': source_hash, 'output': chart['output']})
+            manifest['charts'][name]['output_hash'] = file_sha256(os.path.join(staging, chart['output']))
+        # Saved before the swap, like in a full build
+        save_aggregate_state(state)
+        save_build_manifest(manifest)
+        swap_snapshot(staging, INGEST_COMPRESSION)
+    except Exception:
+        discard_snapshot(staging)
+        raise
+    set_current_season(None)
+    
+    print(f"Ingested {len(new_frame)} rows in {time.perf_counter() - start_time:.3f}s")
     
-    # Convert datetime objects to strings before JSON serialization
-    for record in mvp_data:
-        for key, value in record.items():
-            if isinstance(value, (pd.Timestamp, datetime)):
-                record[key] = value.strftime('%Y-%m-%d')
+    if verify:
+        verify_against_full_rebuild()
+
+def json_equivalent(a, b):
+    """Compare two parsed JSON values, allowing for floating-point rounding"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(json_equivalent(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(json_equivalent(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+def verify_against_full_rebuild():
+    """Rebuild every chart from the full season in a temporary directory and compare with data/"""
+    manifest = load_build_manifest()
+    season = build_season_data(normalize_frame(load_full_frame(manifest['source'],
+                                                               manifest.get('increments', []))))
+    mismatches = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, errors = run_chart_processors(season, CHART_PROCESSORS, out_dir=tmp_dir)
+        if errors:
+            raise Exception(f"Full rebuild failed for: {', '.join(errors)}")
+        for chart in CHART_PROCESSORS:
+            with open(os.path.join(DATA_DIR, chart['output'])) as f:
+                current = json.load(f)
+            with open(os.path.join(tmp_dir, chart['output'])) as f:
+                rebuilt = json.load(f)
+            if not json_equivalent(current, rebuilt):
+                mismatches.append(chart['name'])
     
-    with open('data/mvp_data.json', 'w') as f:
-        json.dump(mvp_data, f, cls=CustomJSONEncoder)
+    if mismatches:
+        raise Exception(f"Incremental outputs differ from a full rebuild: {', '.join(mismatches)}")
+    print("Consistency check passed: incremental outputs match a full rebuild")
+
+def require_columns(df, required_cols, chart_name):
+    """Raise if the normalized frame lacks any column a chart needs"""
+    missing = [col for col in required_cols if col not in df.columns]
+    if missing:
+        raise Exception(f"Missing required columns for {chart_name}: {missing}")
+
+def season_labels(dates):
+    """Season label ('2024-25') for each date; seasons start in August"""
+    start_year = dates.dt.year.where(dates.dt.month >= 8, dates.dt.year - 1)
+    labels = {year: f"{int(year)}-{(int(year) + 1) % 100:02d}" for year in start_year.dropna().unique()}
+    return start_year.map(labels)
+
+class MetricInputs:
+    """
+    Normalized columns as float64 arrays, converted once and shared by every metric of a pass.
     
-    print(f"MVP data processed with {len(mvp_df)} records for {len(qualified_players)} players")
+    Missing values become NaN. Columns the frame lacks read as zeros through get(), for
+    metrics whose formula simply drops a missing component.
+    """
+    
+    def __init__(self, frame):
+        self.frame = frame
+        self.arrays = {}
+        self.team_codes = None
+    
+    def __getitem__(self, col):
+        if col not in self.arrays:
+            self.arrays[col] = pd.to_numeric(self.frame[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        return self.arrays[col]
+    
+    def get(self, col):
+        return self[col] if col in self.frame.columns else np.zeros(len(self.frame))
+    
+    def team_total(self, col):
+        """Sum of a column over each row's team and date, aligned with the rows"""
+        if self.team_codes is None:
+            self.team_codes = (self.frame.groupby(['Tm', 'Date'], sort=False, dropna=False, observed=True)
+                               .ngroup().to_numpy())
+        return np.bincount(self.team_codes, weights=np.nan_to_num(self[col]))[self.team_codes]
 
-def process_championship_data(df):
-    """Process data for the championship prediction chart"""
-    # Verify and map column names
-    required_cols = ['Tm', 'PTS']
-    
-    # Map columns
-    col_mapping = {}
-    for req_col in required_cols:
-        matches = [col for col in df.columns if col.upper() == req_col.upper()]
-        if matches:
-            col_mapping[req_col] = matches[0]
-        else:
-            similar = [col for col in df.columns if req_col.upper() in col.upper()]
-            if similar:
-                col_mapping[req_col] = similar[0]
-    
-    # Check for result column (W/L)
-    result_col = None
-    result_candidates = ['Res', 'Result', 'WL', 'W/L']
-    for rc in result_candidates:
-        matches = [col for col in df.columns if col.upper() == rc.upper()]
-        if matches:
-            result_col = matches[0]
-            break
+def ratio(numerator, denominator):
+    """Elementwise numerator / denominator, NaN where the denominator is zero or missing"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+def game_score(x):
+    """
+    Game Score, using every component of the full formula that is available:
+    GmSc = PTS + 0.4 * FG - 0.7 * FGA - 0.4*(FTA - FT) + 0.7 * ORB + 0.3 * DRB + STL + 0.7 * AST + 0.7 * BLK - 0.4 * PF - TOV
+    """
+    return (x['PTS'] + 0.4 * x.get('FG') - 0.7 * x.get('FGA') - 0.4 * (x.get('FTA') - x.get('FT'))
+            + 0.7 * x.get('ORB') + 0.3 * x.get('DRB') + x.get('STL') + 0.7 * x.get('AST')
+            + 0.7 * x.get('BLK') - 0.4 * x.get('PF') - x.get('TOV'))
+
+def usage_rate(x):
+    """Approximate usage rate: the share of team possessions used while on the floor, from team totals of the game"""
+    used = x['FGA'] + 0.44 * x['FTA'] + x['TOV']
+    team_used = x.team_total('FGA') + 0.44 * x.team_total('FTA') + x.team_total('TOV')
+    return 100 * ratio(used * x.team_total('MP') / 5, x['MP'] * team_used)
+
+# Per-game derived metrics: the columns each one needs, and its formula over MetricInputs.
+# A metric that is already a column of the frame (such as GmSc in the Kaggle data) is taken as is.
+DERIVED_METRICS = {
+    'GmSc': {'requires': ['PTS'], 'compute': game_score},
+    'TS%': {'requires': ['PTS', 'FGA', 'FTA'],
+            'compute': lambda x: ratio(x['PTS'], 2 * (x['FGA'] + 0.44 * x['FTA']))},
+    'eFG%': {'requires': ['FG', '3P', 'FGA'], 'compute': lambda x: ratio(x['FG'] + 0.5 * x['3P'], x['FGA'])},
+    'USG%': {'requires': ['Tm', 'Date', 'FGA', 'FTA', 'TOV', 'MP'], 'compute': usage_rate},
+    'PTS/36': {'requires': ['PTS', 'MP'], 'compute': lambda x: ratio(36 * x['PTS'], x['MP'])},
+    'TRB/36': {'requires': ['TRB', 'MP'], 'compute': lambda x: ratio(36 * x['TRB'], x['MP'])},
+    'AST/36': {'requires': ['AST', 'MP'], 'compute': lambda x: ratio(36 * x['AST'], x['MP'])},
+}
+
+def compute_metrics(frame, names):
+    """
+    Compute derived metrics for every row of a normalized frame in one pass.
     
-    if not all(col in col_mapping for col in required_cols):
-        missing = [col for col in required_cols if col not in col_mapping]
-        raise Exception(f"Missing required columns for championship chart: {missing}")
-    
-    # Group by team
-    team_df = df.groupby(col_mapping['Tm']).agg({
-        col_mapping['PTS']: 'mean',
-        'Date': 'count',  # to get games played
-    }).reset_index()
-    
-    # Calculate win percentage if result column is available
-    if result_col:
-        # Get win percentage for each team
-        win_pcts = {}
-        for team in team_df[col_mapping['Tm']]:
-            team_games = df[df[col_mapping['Tm']] == team]
-            if len(team_games) > 0:
-                # Count wins (assuming W represents wins)
-                wins = sum(1 for res in team_games[result_col] if isinstance(res, str) and res.upper().startswith('W'))
-                win_pcts[team] = wins / len(team_games)
-            else:
-                win_pcts[team] = 0.5  # Default
-        
-        # Add win percentage to dataframe
-        team_df['winPct'] = team_df[col_mapping['Tm']].map(win_pcts)
-    else:
-        # Estimate win percentage from points differential if available
-        print("No result column found, estimating win percentage from points scored")
-        mean_pts = team_df[col_mapping['PTS']].mean()
-        std_pts = team_df[col_mapping['PTS']].std()
-        team_df['winPct'] = team_df[col_mapping['PTS']].apply(
-            lambda x: 0.5 + 0.3 * (x - mean_pts) / (std_pts if std_pts > 0 else 1)
-        )
-        # Clip to reasonable range
-        team_df['winPct'] = team_df['winPct'].clip(0.1, 0.9)
-    
-    # Rename columns
-    team_df.columns = ['team', 'avgPointsScored', 'games', 'winPct']
-    
-    # Add points allowed - estimate from win percentage and points scored
-    team_df['avgPointsAllowed'] = team_df['avgPointsScored'] - 10 * (team_df['winPct'] - 0.5)
-    
-    # Add conference (East/West) - try to find in the dataset or infer from team names
-    conferences = ['East', 'West']
+    Each input column is converted to a float array once and shared by all the requested
+    metrics. Returns {name: array aligned with frame}. Raises ValueError for an unknown
+    metric or one whose columns the frame lacks.
+    """
+    inputs = MetricInputs(frame)
+    values = {}
+    for name in names:
+        if name not in DERIVED_METRICS:
+            raise ValueError(f"Unknown metric '{name}'; available: {', '.join(DERIVED_METRICS)}")
+        if name in frame.columns:
+            values[name] = inputs[name]
+            continue
+        missing = [col for col in DERIVED_METRICS[name]['requires'] if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Metric '{name}' needs columns the dataset lacks: {missing}")
+        values[name] = np.asarray(DERIVED_METRICS[name]['compute'](inputs), dtype=float)
+    return values
+
+def normalize_frame(df, verbose=True):
+    """
+    Build the canonical frame shared by every chart processor.
+    
+    Source columns are renamed to their canonical names once, and the shared derived
+    columns (minutes and Game Score) are computed once. Processors receive this same
+    frame and must treat it as read-only; with copy-on-write, their column selections
+    are views rather than copies. Pass verbose=False to skip the progress messages,
+    as the streaming build does for every chunk after the first.
+    """
+    log = print if verbose else lambda *args: None
+    mapping = resolve_columns(df.columns)
+    log(f"Column mapping: {mapping}")
+    
+    frame = df[list(mapping.values())].set_axis(list(mapping.keys()), axis=1)
+    
+    # Minutes played, synthesized from starter status or points when the dataset lacks them
+    if 'MP' not in frame.columns:
+        log("No minutes played column found. Looking for alternative indicators...")
+        if 'Starter' in frame.columns:
+            log(f"Using {mapping['Starter']} to determine bench players")
+            frame['MP'] = np.where(
+                frame['Starter'].astype(str).str.upper().str.contains('START'),
+                np.random.uniform(25, 38, len(frame)),  # Starters
+                np.random.uniform(10, 24, len(frame))   # Bench
+            )
+        elif 'PTS' in frame.columns:
+            log("Creating synthetic minutes based on points scored")
+            frame['MP'] = 15 + 20 * (frame['PTS'] / frame['PTS'].mean())
+    elif not pd.api.types.is_numeric_dtype(frame['MP']):
+        # Minutes stored as "MM:SS" strings
+        parts = frame['MP'].astype(str).str.split(':', expand=True)
+        frame['MP'] = pd.to_numeric(parts[0], errors='coerce')
+        if parts.shape[1] > 1:
+            frame['MP'] += pd.to_numeric(parts[1], errors='coerce').fillna(0) / 60
+    
+    # Game Score from the derived-metrics engine when the dataset lacks it
+    if 'GmSc' not in frame.columns and 'PTS' in frame.columns:
+        frame['GmSc'] = compute_metrics(frame, ['GmSc'])['GmSc']
+        log("Game Score calculated from available statistics")
+    
+    frame['Season'] = season_labels(frame['Date'])
+    return frame
+
+def aggregate_team_days(df):
+    """
+    Aggregate player rows to one row per team and date in a single groupby pass:
+    the team's points, player rows, winning player rows, result, opponent and conference.
+    """
+    aggregations = {
+        'points': ('PTS', 'sum'),
+        'rows': ('PTS', 'size'),
+    }
+    if 'Res' in df.columns:
+        df = df.assign(isWin=df['Res'].astype(str).str.upper().str.startswith('W'))
+        aggregations['winRows'] = ('isWin', 'sum')
+    if 'Opp' in df.columns:
+        aggregations['opponent'] = ('Opp', 'first')
     if 'Conference' in df.columns:
-        # Map teams to conferences
-        team_conferences = {}
-        for team in team_df['team']:
-            team_games = df[df[col_mapping['Tm']] == team]
-            if len(team_games) > 0 and 'Conference' in team_games.columns:
-                conf = team_games['Conference'].iloc[0]
-                team_conferences[team] = conf
+        aggregations['conference'] = ('Conference', 'first')
+    
+    team_days = df.groupby(['Tm', 'Date'], sort=True, observed=True).agg(**aggregations).reset_index()
+    if 'winRows' in team_days.columns:
+        team_days['win'] = team_days['winRows'] > 0
+    return team_days
+
+def merge_team_days(team_days, new_days):
+    """Combine two team-day tables, summing any team and date present in both"""
+    combined = pd.concat([team_days, new_days], ignore_index=True)
+    if not combined.duplicated(['Tm', 'Date']).any():
+        return combined.sort_values(['Tm', 'Date'], ignore_index=True)
+    
+    aggregations = {col: ('first' if col in ('opponent', 'conference') else 'sum')
+                    for col in combined.columns if col not in ('Tm', 'Date', 'win')}
+    merged = combined.groupby(['Tm', 'Date'], sort=True, observed=True).agg(aggregations).reset_index()
+    if 'winRows' in merged.columns:
+        merged['win'] = merged['winRows'] > 0
+    return merged
+
+def team_game_logs(team_days):
+    """
+    One row per team game, derived from the team-day aggregates of the player rows.
+    
+    Each team-day is joined to its opponent's team-day on the same date to get points
+    allowed. The result comes from the players' result column, or from comparing the two
+    scores when the dataset has no result column, and is NA when neither is known. Running
+    wins and losses count from the start of each season. Rows stay in the order of team_days.
+    """
+    columns = ['Tm', 'Date', 'points'] + [col for col in ('opponent', 'conference') if col in team_days.columns]
+    logs = team_days[columns].reset_index(drop=True)
+    if 'opponent' in logs.columns:
+        opponents = team_days[['Tm', 'Date', 'points']].rename(columns={'Tm': 'opponent', 'points': 'pointsAllowed'})
+        logs = logs.merge(opponents, on=['opponent', 'Date'], how='left')
+    else:
+        logs['pointsAllowed'] = np.nan
+    
+    if 'win' in team_days.columns:
+        win = pd.Series(team_days['win'].to_numpy(), index=logs.index, dtype='boolean')
+    else:
+        win = pd.Series(pd.NA, index=logs.index, dtype='boolean')
+        decided = logs['pointsAllowed'].notna() & (logs['points'] != logs['pointsAllowed'])
+        win[decided] = logs.loc[decided, 'points'] > logs.loc[decided, 'pointsAllowed']
+    logs['win'] = win
+    logs['result'] = win.map({True: 'W', False: 'L'}).astype(object).where(win.notna(), None)
+    
+    logs['Season'] = season_labels(logs['Date'])
+    by_season = [logs['Tm'], logs['Season']]
+    logs['wins'] = win.fillna(False).astype(int).groupby(by_season).cumsum()
+    logs['losses'] = (~win).fillna(False).astype(int).groupby(by_season).cumsum()
+    return logs
+
+def summarize_teams(logs):
+    """Roll team game logs up to per-team games, wins, points scored and allowed, and conference"""
+    totals = {
+        'games': ('points', 'size'),
+        'avgPointsScored': ('points', 'mean'),
+        'avgPointsAllowed': ('pointsAllowed', 'mean'),
+        'wins': ('win', 'sum'),
+        'decided': ('win', 'count')
+    }
+    if 'conference' in logs.columns:
+        totals['conference'] = ('conference', 'first')
+    teams = logs.groupby('Tm', sort=True, observed=True).agg(**totals)
+    teams['winPct'] = (teams['wins'] / teams['decided'].where(teams['decided'] > 0)).astype(float)
+    
+    # Fill conferences from the team abbreviation, picking at random for unknown teams
+    conference = teams['conference'] if 'conference' in teams.columns else pd.Series(np.nan, index=teams.index)
+    conference = conference.fillna(teams.index.to_series().map(TEAM_CONFERENCES))
+    unknown = conference.isna()
+    if unknown.any():
+        conference[unknown] = np.random.choice(['East', 'West'], unknown.sum())
+    teams['conference'] = conference
+    
+    return teams.rename_axis('team').reset_index()
+
+def fold_name(name):
+    """Search key of a player name: accents stripped, case folded and whitespace collapsed"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+class PlayerSearchIndex:
+    """
+    Accent- and case-insensitive lookup of player names.
+    
+    Spellings that fold to the same key (such as 'Luka Dončić' and 'Luka Doncic') share one
+    player ID, whose canonical name is the spelling with the most games. Every word of a
+    name starts a search key, so a prefix matches first or last names. Keys are kept in a
+    sorted list, so a prefix query is a binary search plus one step per result.
+    """
+    
+    def __init__(self, names):
+        spellings = {}
+        # Most frequent spelling first, so it becomes the canonical name
+        for name, games in game_counts(names.dropna()).items():
+            key = fold_name(name)
+            if key in spellings:
+                spellings[key]['games'] += int(games)
             else:
-                # Try to infer from team abbreviation
-                eastern_teams = ['BOS', 'NYK', 'PHI', 'TOR', 'CHI', 'CLE', 'DET', 'IND', 'MIL', 
-                                'ATL', 'CHA', 'MIA', 'ORL', 'WAS', 'BKN']
-                western_teams = ['DAL', 'HOU', 'MEM', 'NOP', 'SAS', 'DEN', 'MIN', 'OKC', 'POR', 
-                                'UTA', 'GSW', 'LAC', 'LAL', 'PHX', 'SAC']
-                
-                if team in eastern_teams:
-                    team_conferences[team] = 'East'
-                elif team in western_teams:
-                    team_conferences[team] = 'West'
-                else:
-                    team_conferences[team] = np.random.choice(conferences)
+                spellings[key] = {'name': name, 'games': int(games)}
         
-        team_df['conference'] = team_df['team'].map(team_conferences)
-    else:
-        # Infer conferences from team names
-        eastern_teams = ['BOS', 'NYK', 'PHI', 'TOR', 'CHI', 'CLE', 'DET', 'IND', 'MIL', 
-                        'ATL', 'CHA', 'MIA', 'ORL', 'WAS', 'BKN']
-        western_teams = ['DAL', 'HOU', 'MEM', 'NOP', 'SAS', 'DEN', 'MIN', 'OKC', 'POR', 
-                        'UTA', 'GSW', 'LAC', 'LAL', 'PHX', 'SAC']
+        self.players = []
+        self.ids = {}
+        entries = []
+        for key in sorted(spellings):
+            player_id = len(self.players)
+            self.players.append({'id': player_id, **spellings[key]})
+            self.ids[key] = player_id
+            words = key.split()
+            entries += [(' '.join(words[i:]), player_id) for i in range(len(words))]
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.key_ids = [player_id for _, player_id in entries]
+    
+    def resolve(self, name):
+        """Canonical spelling of a player name, or None for an unknown player"""
+        player_id = self.ids.get(fold_name(name))
+        return self.players[player_id]['name'] if player_id is not None else None
+    
+    def search(self, query, n=10):
+        """Up to n players with a name, or a word of one, starting with query, in key order"""
+        query = fold_name(query)
+        if not query:
+            return []
+        found = {}
+        i = bisect.bisect_left(self.keys, query)
+        while i < len(self.keys) and len(found) < n and self.keys[i].startswith(query):
+            found.setdefault(self.key_ids[i], self.players[self.key_ids[i]])
+            i += 1
+        return list(found.values())
+
+def player_stat_vectors(df, resolve=None):
+    """
+    Games and per-game averages of SIMILARITY_STATS for each player, from grouped sums.
+    
+    resolve maps each spelling to the player's canonical name, so spellings of one player
+    are combined. Shooting percentages are made over attempted shots where the made and
+    attempted columns exist; a player without attempts gets NaN.
+    """
+    rows = df[df['Player'].notna()]
+    grouped = rows.groupby('Player', observed=True)
+    averaged = [stat for stat in SIMILARITY_STATS if stat not in SIMILARITY_SHOTS and stat in rows.columns]
+    shots = {stat: cols for stat, cols in SIMILARITY_SHOTS.items() if all(col in rows.columns for col in cols)}
+    shot_cols = [col for cols in shots.values() for col in cols]
+    rates = [stat for stat in SIMILARITY_STATS if stat in SIMILARITY_SHOTS and stat not in shots and stat in rows.columns]
+    
+    sums = pd.concat([grouped.size().rename('games'),
+                      grouped[averaged + shot_cols].sum(),
+                      grouped[averaged + rates].count().add_suffix(' n'),
+                      grouped[rates].sum()], axis=1)
+    if resolve is not None:
+        sums = sums.groupby(sums.index.map(lambda name: resolve(name) or name)).sum()
+    
+    vectors = pd.DataFrame({'games': sums['games']}, index=sums.index)
+    for stat in SIMILARITY_STATS:
+        if stat in shots:
+            made, attempts = shots[stat]
+            vectors[stat] = sums[made] / sums[attempts].where(sums[attempts] > 0)
+        elif stat in averaged or stat in rates:
+            vectors[stat] = sums[stat] / sums[f'{stat} n'].where(sums[f'{stat} n'] > 0)
+    return vectors
+
+class PlayerSimilarityIndex:
+    """
+    Nearest players by their per-game stat vectors (player_stat_vectors).
+    
+    Each stat is standardized across the players, missing values become the league
+    mean, and every row is scaled to unit length, once per season. The similarity of
+    two players is then the cosine of their standardized vectors, and a query is one
+    matrix product of the asked-for rows with the whole matrix.
+    """
+    
+    def __init__(self, vectors, min_games=SIMILARITY_MIN_GAMES):
+        self.vectors = vectors[vectors['games'] >= min_games].sort_index()
+        self.stats = [stat for stat in SIMILARITY_STATS
+                      if stat in self.vectors.columns and self.vectors[stat].notna().any()]
+        values = self.vectors[self.stats].to_numpy(dtype=np.float64)
+        mean = np.nanmean(values, axis=0) if len(values) else np.zeros(len(self.stats))
+        std = np.nanstd(values, axis=0) if len(values) else np.ones(len(self.stats))
+        standardized = np.nan_to_num((values - mean) / np.where(std > 0, std, 1.0))
+        norms = np.linalg.norm(standardized, axis=1, keepdims=True)
+        self.matrix = standardized / np.where(norms > 0, norms, 1.0)
+        self.players = self.vectors.index.to_numpy(dtype=object)
+        self.positions = {player: i for i, player in enumerate(self.players)}
+        # Response entries are built once, so a query only picks among them
+        self.profiles = [{'player': player, 'games': int(games),
+                          'stats': {stat: optional_float(value) for stat, value in zip(self.stats, row)}}
+                         for player, games, row in zip(self.players, self.vectors['games'], values)]
+    
+    def similar(self, names, k=10):
+        """
+        The k most similar players to each name, most similar first; None for names
+        without enough games. Names must be canonical spellings.
+        """
+        positions = [self.positions.get(name) for name in names]
+        found = [position for position in positions if position is not None]
+        if not found:
+            return [None] * len(names)
+        k = min(k, len(self.players) - 1)
+        scores = self.matrix[found] @ self.matrix.T
+        scores[np.arange(len(found)), found] = -np.inf
         
-        team_df['conference'] = team_df['team'].apply(
-            lambda team: 'East' if team in eastern_teams else 
-                         'West' if team in western_teams else 
-                         np.random.choice(conferences)
-        )
+        results = iter(scores)
+        answers = []
+        for position in positions:
+            if position is None:
+                answers.append(None)
+                continue
+            row = next(results)
+            nearest = np.argpartition(-row, k - 1)[:k] if k > 0 else np.array([], dtype=np.int64)
+            nearest = nearest[np.argsort(-row[nearest], kind='stable')]
+            answers.append({**self.profiles[position],
+                            'similar': [{**self.profiles[i], 'similarity': float(row[i])} for i in nearest]})
+        return answers
+
+def rolling_form(df):
+    """
+    Each player's form after every one of their games, in one grouped pass over rows sorted by date.
     
-    # Convert to JSON and save
-    champ_data = team_df.to_dict(orient='records')
-    with open('data/champ_data.json', 'w') as f:
-        json.dump(champ_data, f, cls=CustomJSONEncoder)
+    For each stat in FORM_STATS there is a mean over the last N games for every N in
+    FORM_WINDOWS (over fewer games at the start of a career), named like 'PTS_last10', and an
+    exponentially weighted mean named like 'PTS_ewm'. Windows run across season boundaries.
+    Rows keep Player, Date and Season, so the result can be indexed with GameIndex.
+    """
+    stats = [stat for stat in FORM_STATS if stat in df.columns]
+    rows = (df.loc[df['Player'].notna() & df['Date'].notna(), ['Player', 'Date', 'Season'] + stats]
+            .sort_values(['Player', 'Date'], kind='stable', ignore_index=True))
+    grouped = rows.groupby('Player', sort=False, observed=True)[stats]
     
-    print(f"Championship data processed with {len(team_df)} teams")
+    windows = [grouped.rolling(n, min_periods=1).mean().add_suffix(f'_last{n}') for n in FORM_WINDOWS]
+    windows.append(grouped.ewm(span=FORM_EWM_SPAN).mean().add_suffix('_ewm'))
+    form = pd.concat([window.reset_index(level=0, drop=True) for window in windows], axis=1)
+    return pd.concat([rows[['Player', 'Date', 'Season']], form], axis=1)
 
-def process_scoring_data(df):
-    """Process data for the scoring leader chart"""
-    # Verify and map column names
-    required_cols = ['Player', 'Date', 'PTS']
+class GameIndex:
+    """
+    Game logs partitioned by season, each partition sorted by a key column and date.
     
-    # Map columns
-    col_mapping = {}
-    for req_col in required_cols:
-        matches = [col for col in df.columns if col.upper() == req_col.upper()]
-        if matches:
-            col_mapping[req_col] = matches[0]
-        else:
-            similar = [col for col in df.columns if req_col.upper() in col.upper()]
-            if similar:
-                col_mapping[req_col] = similar[0]
+    The key is the player for player rows, or the team for team-day rows. A lookup
+    binary-searches the key's block of rows in every partition whose dates overlap the
+    requested range, then binary-searches the dates inside that block. The cost depends
+    on the number of seasons and rows returned, not on the total number of rows in the
+    history.
+    """
+    
+    def __init__(self, frame, key='Player'):
+        self.partitions = []
+        frame = frame[frame[key].notna() & frame['Date'].notna()]
+        for season, rows in frame.groupby('Season', sort=True, observed=True):
+            rows = rows.sort_values([key, 'Date'], kind='stable', ignore_index=True)
+            names, starts = np.unique(rows[key].to_numpy(dtype=object), return_index=True)
+            dates = rows['Date'].to_numpy()
+            self.partitions.append({
+                'season': season,
+                'rows': rows,
+                'names': names,
+                'starts': starts,
+                'ends': np.append(starts[1:], len(rows)),
+                'dates': dates,
+                'first': dates.min(),
+                'last': dates.max()
+            })
+    
+    def games(self, name, date_from=None, date_to=None):
+        """Games of one player (or team) between two optional dates (inclusive), oldest first"""
+        date_from = date_from.to_datetime64() if date_from is not None else None
+        date_to = date_to.to_datetime64() if date_to is not None else None
+        
+        blocks = []
+        for partition in self.partitions:
+            if date_from is not None and partition['last'] < date_from:
+                continue
+            if date_to is not None and partition['first'] > date_to:
+                continue
+            names = partition['names']
+            i = np.searchsorted(names, name)
+            if i == len(names) or names[i] != name:
+                continue
+            start, end = partition['starts'][i], partition['ends'][i]
+            player_dates = partition['dates'][start:end]
+            if date_to is not None:
+                end = start + np.searchsorted(player_dates, date_to, side='right')
+            if date_from is not None:
+                start += np.searchsorted(player_dates, date_from, side='left')
+            if start < end:
+                blocks.append(partition['rows'].iloc[start:end])
+        
+        if not blocks:
+            return self.partitions[0]['rows'].iloc[:0] if self.partitions else pd.DataFrame()
+        return blocks[0] if len(blocks) == 1 else pd.concat(blocks, ignore_index=True)
     
-    if not all(col in col_mapping for col in required_cols):
-        missing = [col for col in required_cols if col not in col_mapping]
-        raise Exception(f"Missing required columns for scoring chart: {missing}")
+    def latest(self, name, date=None):
+        """The last row of a player (or team) on or before an optional date, or None"""
+        date = date.to_datetime64() if date is not None else None
+        for partition in reversed(self.partitions):
+            if date is not None and partition['first'] > date:
+                continue
+            names = partition['names']
+            i = np.searchsorted(names, name)
+            if i == len(names) or names[i] != name:
+                continue
+            start, end = partition['starts'][i], partition['ends'][i]
+            if date is not None:
+                end = start + np.searchsorted(partition['dates'][start:end], date, side='right')
+            if start < end:
+                return partition['rows'].iloc[end - 1]
+        return None
+
+class SeasonData:
+    """
+    The normalized season frame plus the derived tables built from it.
     
-    # Select relevant columns
-    scoring_df = df[[col_mapping[col] for col in required_cols]].copy()
-    scoring_df.columns = required_cols
+    frame holds the season the charts describe; history holds every loaded season.
+    Derived tables are computed on first use and then shared by every chart
+    processor, so each one is built at most once per build.
+    """
     
-    # Filter to top scoring players
-    player_avg_pts = scoring_df.groupby('Player')['PTS'].mean()
+    def __init__(self, frame, history=None):
+        self.frame = frame
+        self.history = frame if history is None else history
+        self.metric_values = {}
+        self.metrics_lock = threading.Lock()
+    
+    def metrics(self, names):
+        """Derived metrics (DERIVED_METRICS) for every history row; only ones not asked for before are computed"""
+        with self.metrics_lock:
+            missing = [name for name in names if name not in self.metric_values]
+            if missing:
+                with pipeline_stage('metrics', len(self.history)) as stage:
+                    self.metric_values.update(compute_metrics(self.history, missing))
+                    stage['output_rows'] = len(self.history)
+            return pd.DataFrame({name: self.metric_values[name] for name in names}, index=self.history.index)
+    
+    @cached_property
+    def game_index(self):
+        """GameIndex of player rows over the full history, keyed on canonical player names"""
+        with pipeline_stage('game_index', len(self.history)):
+            return GameIndex(self.canonical_history)
+    
+    @cached_property
+    def canonical_history(self):
+        """
+        history with every spelling of a player's name replaced by its canonical one
+        (PlayerSearchIndex.resolve), so the per-player indexes find all of a player's rows
+        under the name the routes resolve to
+        """
+        names = self.history['Player']
+        canonical = {name: self.player_search.resolve(name) for name in names.dropna().unique()}
+        if all(name == resolved for name, resolved in canonical.items()):
+            return self.history
+        return self.history.assign(Player=names.map(canonical))
+    
+    @cached_property
+    def player_search(self):
+        """PlayerSearchIndex of every player in the full history"""
+        with pipeline_stage('player_search', len(self.history)) as stage:
+            index = PlayerSearchIndex(self.history['Player'])
+            stage['output_rows'] = len(index.players)
+            return index
+    
+    @cached_property
+    def player_similarity(self):
+        """PlayerSimilarityIndex of the players of the season the charts describe"""
+        with pipeline_stage('player_similarity', len(self.frame)) as stage:
+            index = PlayerSimilarityIndex(player_stat_vectors(self.frame, self.player_search.resolve))
+            stage['output_rows'] = len(index.players)
+            return index
+    
+    @cached_property
+    def player_form(self):
+        """GameIndex of rolling_form over the full history, for form as of any date, keyed on canonical names"""
+        with pipeline_stage('player_form', len(self.history)) as stage:
+            form = rolling_form(self.canonical_history)
+            stage['output_rows'] = len(form)
+            return GameIndex(form)
+    
+    @cached_property
+    def team_days(self):
+        """Team-day aggregates (aggregate_team_days) over the full history, in one groupby pass"""
+        with pipeline_stage('team_days', len(self.history)) as stage:
+            team_days = aggregate_team_days(self.history)
+            stage['output_rows'] = len(team_days)
+        return team_days
+    
+    @cached_property
+    def team_game_logs(self):
+        """team_game_logs over the full history, row-aligned with team_days"""
+        with pipeline_stage('team_game_logs', len(self.team_days)) as stage:
+            logs = team_game_logs(self.team_days)
+            stage['output_rows'] = len(logs)
+        return logs
+    
+    @cached_property
+    def team_game_index(self):
+        """GameIndex of team game logs over the full history"""
+        with pipeline_stage('team_game_index', len(self.team_game_logs)):
+            return GameIndex(self.team_game_logs, key='Tm')
+    
+    @cached_property
+    def team_aggregates(self):
+        """(teams, team_days) of the season the charts describe, from summarize_teams"""
+        with pipeline_stage('team_aggregates', len(self.frame)) as stage:
+            in_season = self.team_game_logs['Season'].isin(self.frame['Season'].unique()).to_numpy()
+            team_days = self.team_days[in_season].reset_index(drop=True)
+            teams = summarize_teams(self.team_game_logs[in_season])
+            stage['output_rows'] = len(team_days)
+        return teams, team_days
+
+def compact_frame(frame):
+    """
+    Shrink a normalized frame with the COMPACT_* dtypes and report its memory before and after.
+    
+    Counting stats with missing values stay float64, so their averages match those of the full frame.
+    """
+    with pipeline_stage('compact', len(frame)) as stage:
+        before = frame.memory_usage(deep=True).sum()
+        columns = {}
+        for col in COMPACT_CATEGORIES:
+            if col in frame.columns and not isinstance(frame[col].dtype, pd.CategoricalDtype):
+                columns[col] = frame[col].astype('category')
+        for col in COMPACT_COUNTS:
+            if col in frame.columns and pd.api.types.is_integer_dtype(frame[col]):
+                columns[col] = pd.to_numeric(frame[col], downcast='integer')
+        for col in COMPACT_RATES:
+            if col in frame.columns and pd.api.types.is_float_dtype(frame[col]):
+                columns[col] = frame[col].astype('float32')
+        frame = frame.assign(**columns)
+        after = frame.memory_usage(deep=True).sum()
+        stage['output_rows'] = len(frame)
+        stage['output_bytes'] = int(after)
+    print(f"Compact frame: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+    return frame
+
+def build_season_data(history):
+    """
+    SeasonData for a normalized multi-season frame; the charts describe the latest season.
+    
+    With COMPACT_FRAME set, the frame is compacted first and every processor sees the compact dtypes.
+    """
+    if COMPACT_FRAME:
+        history = compact_frame(history)
+    seasons = history['Season'].dropna().unique()
+    if len(seasons) <= 1:
+        return SeasonData(history)
+    latest = max(seasons)
+    print(f"Loaded {len(seasons)} seasons, charts use {latest}")
+    return SeasonData(history[history['Season'] == latest], history)
+
+def game_counts(players):
+    """Rows per player, most first, leaving out the unused categories of a categorical column"""
+    counts = players.value_counts()
+    return counts[counts > 0]
+
+def mvp_qualified_players(player_game_counts):
+    """Players with enough games to be in the MVP race, using an adaptive threshold"""
+    min_games = max(5, player_game_counts.quantile(0.75) // 2)
+    return player_game_counts[player_game_counts >= min_games].index
+
+def top_scoring_players(player_avg_pts, player_games, n):
+    """Average points of the n highest-scoring players with enough games, highest first"""
     min_games = 5  # Minimum games to be considered
-    player_games = scoring_df['Player'].value_counts()
     qualified_players = player_games[player_games >= min_games].index
     
-    if len(qualified_players) < 5:
+    if len(qualified_players) < 5 and len(player_games) > 0:
         print(f"Warning: Only {len(qualified_players)} players with {min_games}+ games. Reducing minimum game threshold.")
         min_games = max(1, min(player_games))
         qualified_players = player_games[player_games >= min_games].index
     
-    top_scorers = player_avg_pts[player_avg_pts.index.isin(qualified_players)].nlargest(10).index
-    scoring_df = scoring_df[scoring_df['Player'].isin(top_scorers)]
+    return player_avg_pts[player_avg_pts.index.isin(qualified_players)].nlargest(n)
+
+def process_mvp_data(season, out_dir=DATA_DIR):
+    """Process data for the MVP prediction chart"""
+    df = season.frame
+    required_cols = ['Player', 'Date', 'PTS', 'AST', 'TRB', 'GmSc']
+    require_columns(df, required_cols, 'MVP chart')
+    mvp_df = df[required_cols]
+    
+    # Filter out players with too few games
+    qualified_players = mvp_qualified_players(game_counts(mvp_df['Player']))
+    mvp_df = mvp_df[mvp_df['Player'].isin(qualified_players)]
     
     # Convert to JSON and save
-    scoring_data = scoring_df.to_dict(orient='records')
+    write_records(os.path.join(out_dir, 'mvp_data.json'), mvp_df)
     
-    # Convert datetime objects to strings before JSON serialization
-    for record in scoring_data:
-        for key, value in record.items():
-            if isinstance(value, (pd.Timestamp, datetime)):
-                record[key] = value.strftime('%Y-%m-%d')
+    print(f"MVP data processed with {len(mvp_df)} records for {len(qualified_players)} players")
+
+def championship_table(teams):
+    """Championship chart rows from the per-team summary"""
+    team_df = teams[['team', 'avgPointsScored', 'games', 'winPct']].copy()
     
-    with open('data/scoring_data.json', 'w') as f:
-        json.dump(scoring_data, f, cls=CustomJSONEncoder)
+    # Win percentage from game results, or estimated from points scored where no result is known
+    if team_df['winPct'].isna().any():
+        print("No game results for some teams, estimating their win percentage from points scored")
+        mean_pts = team_df['avgPointsScored'].mean()
+        std_pts = team_df['avgPointsScored'].std()
+        estimated = (0.5 + 0.3 * (team_df['avgPointsScored'] - mean_pts) / (std_pts if std_pts > 0 else 1)).clip(0.1, 0.9)
+        team_df['winPct'] = team_df['winPct'].fillna(estimated)
     
-    print(f"Scoring data processed with {len(scoring_df)} records for {len(top_scorers)} players")
+    # Points allowed from the opponents' box scores, or estimated from win percentage and points scored
+    team_df['avgPointsAllowed'] = teams['avgPointsAllowed']
+    if team_df['avgPointsAllowed'].isna().any():
+        print("No opponent box scores for some teams, estimating their points allowed")
+        team_df['avgPointsAllowed'] = team_df['avgPointsAllowed'].fillna(
+            team_df['avgPointsScored'] - 10 * (team_df['winPct'] - 0.5))
+    team_df['conference'] = teams['conference']
+    return team_df
 
-def process_bench_data(df):
-    """Process data for the bench strength chart"""
-    # Verify and map column names
-    required_cols = ['Player', 'Tm', 'PTS']
-    
-    # Map columns
-    col_mapping = {}
-    for req_col in required_cols:
-        matches = [col for col in df.columns if col.upper() == req_col.upper()]
-        if matches:
-            col_mapping[req_col] = matches[0]
-        else:
-            similar = [col for col in df.columns if req_col.upper() in col.upper()]
-            if similar:
-                col_mapping[req_col] = similar[0]
-    
-    # Look for minutes played column
-    mp_candidates = ['MP', 'MIN', 'Minutes', 'Minutes Played']
-    mp_col = None
-    for mpc in mp_candidates:
-        matches = [col for col in df.columns if col.upper() == mpc.upper()]
-        if matches:
-            mp_col = matches[0]
-            break
+def process_championship_data(season, out_dir=DATA_DIR):
+    """Process data for the championship prediction chart"""
+    require_columns(season.frame, ['Tm', 'PTS'], 'championship chart')
+    teams, _ = season.team_aggregates
+    team_df = championship_table(teams)
     
-    if not all(col in col_mapping for col in required_cols):
-        missing = [col for col in required_cols if col not in col_mapping]
-        raise Exception(f"Missing required columns for bench chart: {missing}")
-    
-    if not mp_col:
-        # If no minutes column, look for starter status or position
-        print("No minutes played column found. Looking for alternative indicators...")
-        starter_candidates = ['Starter', 'Start', 'GS', 'Role']
-        starter_col = None
-        for sc in starter_candidates:
-            matches = [col for col in df.columns if sc.upper() in col.upper()]
-            if matches:
-                starter_col = matches[0]
-                break
-        
-        if starter_col:
-            print(f"Using {starter_col} to determine bench players")
-            # Create a synthetic MP column
-            df['synthetic_MP'] = np.where(
-                df[starter_col].astype(str).str.upper().str.contains('START'), 
-                np.random.uniform(25, 38, len(df)),  # Starters
-                np.random.uniform(10, 24, len(df))   # Bench
-            )
-            mp_col = 'synthetic_MP'
-        else:
-            # Last resort: create a synthetic MP column based on points
-            print("Creating synthetic minutes based on points scored")
-            mean_pts = df[col_mapping['PTS']].mean()
-            df['synthetic_MP'] = 15 + 20 * (df[col_mapping['PTS']] / mean_pts)
-            mp_col = 'synthetic_MP'
-    
-    # For bench players, we'll consider those with < 25 minutes per game
-    bench_df = df[[col_mapping[col] for col in required_cols] + [mp_col]].copy()
-    bench_df.columns = required_cols + ['MP']
-    
-    # Look for Game Score column
-    gmsc_col = next((col for col in df.columns if col.upper() == 'GMSC'), None)
-    
-    # Calculate Game Score if not available
-    if gmsc_col:
-        bench_df['GmSc'] = df[gmsc_col]
-    else:
-        # Try to calculate a better approximation if we have the necessary stats
-        pts_col = col_mapping['PTS']
-        fg_col = next((col for col in df.columns if col.upper() in ['FG', 'FGM']), None)
-        fga_col = next((col for col in df.columns if col.upper() in ['FGA']), None)
-        ft_col = next((col for col in df.columns if col.upper() in ['FT', 'FTM']), None)
-        fta_col = next((col for col in df.columns if col.upper() in ['FTA']), None)
-        orb_col = next((col for col in df.columns if col.upper() in ['ORB', 'OREB']), None)
-        drb_col = next((col for col in df.columns if col.upper() in ['DRB', 'DREB']), None)
-        stl_col = next((col for col in df.columns if col.upper() in ['STL']), None)
-        ast_col = next((col for col in df.columns if col.upper() in ['AST']), None)
-        blk_col = next((col for col in df.columns if col.upper() in ['BLK']), None)
-        pf_col = next((col for col in df.columns if col.upper() in ['PF', 'FOULS']), None)
-        tov_col = next((col for col in df.columns if col.upper() in ['TOV', 'TO']), None)
-        
-        # Start with points
-        bench_df['GmSc'] = bench_df['PTS']
-        
-        # Add other components if available
-        if fg_col and fga_col:
-            bench_df['GmSc'] += 0.4 * df[fg_col] - 0.7 * df[fga_col]
-        if ft_col and fta_col:
-            bench_df['GmSc'] += 0.4 * (df[ft_col] - df[fta_col])
-        if orb_col:
-            bench_df['GmSc'] += 0.7 * df[orb_col]
-        if drb_col:
-            bench_df['GmSc'] += 0.3 * df[drb_col]
-        if stl_col:
-            bench_df['GmSc'] += df[stl_col]
-        if ast_col:
-            bench_df['GmSc'] += 0.7 * df[ast_col]
-        if blk_col:
-            bench_df['GmSc'] += 0.7 * df[blk_col]
-        if pf_col:
-            bench_df['GmSc'] -= 0.4 * df[pf_col]
-        if tov_col:
-            bench_df['GmSc'] -= df[tov_col]
-        
-        print("Game Score calculated from available statistics")
+    # Convert to JSON and save
+    champ_data = team_df.to_dict(orient='records')
+    write_json(os.path.join(out_dir, 'champ_data.json'), champ_data)
+    
+    print(f"Championship data processed with {len(team_df)} teams")
+
+def process_scoring_data(season, out_dir=DATA_DIR):
+    """Process data for the scoring leader chart"""
+    df = season.frame
+    required_cols = ['Player', 'Date', 'PTS']
+    require_columns(df, required_cols, 'scoring chart')
+    scoring_df = df[required_cols]
+    
+    # Filter to top scoring players
+    top_scorers = top_scoring_players(scoring_df.groupby('Player', observed=True)['PTS'].mean(),
+                                      game_counts(scoring_df['Player']), 10).index
+    scoring_df = scoring_df[scoring_df['Player'].isin(top_scorers)]
     
     # Convert to JSON and save
-    bench_data = bench_df.to_dict(orient='records')
+    write_records(os.path.join(out_dir, 'scoring_data.json'), scoring_df)
     
-    # Convert datetime objects to strings before JSON serialization
-    for record in bench_data:
-        for key, value in record.items():
-            if isinstance(value, (pd.Timestamp, datetime)):
-                record[key] = value.strftime('%Y-%m-%d')
+    print(f"Scoring data processed with {len(scoring_df)} records for {len(top_scorers)} players")
+
+def process_bench_data(season, out_dir=DATA_DIR):
+    """Process data for the bench strength chart"""
+    df = season.frame
+    # Bench players are those with < 25 minutes per game; the chart applies the threshold
+    required_cols = ['Player', 'Tm', 'PTS', 'MP', 'GmSc']
+    require_columns(df, required_cols, 'bench chart')
+    bench_df = df[required_cols]
     
-    with open('data/bench_data.json', 'w') as f:
-        json.dump(bench_data, f, cls=CustomJSONEncoder)
+    # Convert to JSON and save
+    write_records(os.path.join(out_dir, 'bench_data.json'), bench_df)
     
     print(f"Bench data processed with {len(bench_df)} records")
 
-def process_trade_impact_data(df):
-    """Process data for the trade impact chart focusing on Luka Dončić and Anthony Davis"""
-    # Verify and map column names
-    required_cols = ['Player', 'Tm', 'PTS', 'MP', 'Date']
-    
-    # Map columns
-    col_mapping = {}
-    for req_col in required_cols:
-        matches = [col for col in df.columns if col.upper() == req_col.upper()]
-        if matches:
-            col_mapping[req_col] = matches[0]
-        else:
-            similar = [col for col in df.columns if req_col.upper() in col.upper()]
-            if similar:
-                col_mapping[req_col] = similar[0]
-    
-    # Set trade date (February 1, 2025 - specific date as requested)
-    trade_date = "2025-02-01"
+def season_bounds(date):
+    """First and last day of the season containing a date; seasons start in August"""
+    start_year = date.year if date.month >= 8 else date.year - 1
+    return pd.Timestamp(start_year, 8, 1), pd.Timestamp(start_year + 1, 7, 31)
+
+def optional_float(value):
+    """float(value), or None for a missing value so it is written as JSON null"""
+    return None if pd.isna(value) else float(value)
+
+def field_goal_pct(games):
+    """Field goal percentage over a set of games: made over attempted shots, else the mean of FG%"""
+    if 'FG' in games.columns and 'FGA' in games.columns:
+        attempts = games['FGA'].sum()
+        return float(games['FG'].sum() / attempts) if attempts else None
+    if 'FG%' in games.columns:
+        return optional_float(games['FG%'].mean())
+    return None
+
+def split_stats(season, games, team, date_from, date_to):
+    """Per-game averages over one side of a trade, with the record of the player's team over the same dates"""
+    if not len(games):
+        return {'games': 0, 'team': None, 'ppg': None, 'mpg': None, 'fgPct': None, 'teamRecord': None}
     
-    # Filter for the specific players we want - Updated with correct post-trade teams
-    target_players = {
-        'Luka Dončić': 'LAL',  # UPDATED: Luka traded to Lakers with accent characters
-        'Anthony Davis': 'DAL'  # UPDATED: Davis traded to Mavericks
+    team_record = None
+    if team is not None:
+        team_games = season.team_game_index.games(team, date_from, date_to)
+        known = team_games['win'].notna().any()
+        team_record = {
+            'games': len(team_games),
+            'wins': int(team_games['win'].sum()) if known else None,
+            'losses': int((~team_games['win']).sum()) if known else None
+        }
+    return {
+        'games': len(games),
+        'team': team,
+        'ppg': optional_float(games['PTS'].mean()),
+        'mpg': optional_float(games['MP'].mean()) if 'MP' in games.columns else None,
+        'fgPct': field_goal_pct(games),
+        'teamRecord': team_record
     }
+
+def trade_splits(season, players, trade_date):
+    """
+    Before and after splits of each player around a trade date, within the trade's season.
     
-    # Filter dataset by player name and date
-    filtered_df = df.copy()
-    filtered_df = filtered_df[filtered_df[col_mapping['Date']] >= pd.to_datetime(trade_date)]
+    Each side has the games played, points and minutes per game, FG%, the team played for
+    (the last one before the trade, the first one after it) and that team's record over the
+    same dates. Player names are matched ignoring accents and case and reported with their
+    canonical spelling. Games come from the season's game indexes, so each player costs a
+    few binary searches rather than a scan of the frame.
+    """
+    start, end = season_bounds(trade_date)
+    day_before = trade_date - pd.Timedelta(days=1)
+    splits = []
+    for player in players:
+        player = season.player_search.resolve(player) or player
+        before = season.game_index.games(player, start, day_before)
+        after = season.game_index.games(player, trade_date, end)
+        has_team = 'Tm' in season.history.columns
+        splits.append({
+            'player': player,
+            'before': split_stats(season, before, before['Tm'].iloc[-1] if has_team and len(before) else None,
+                                  start, day_before),
+            'after': split_stats(season, after, after['Tm'].iloc[0] if has_team and len(after) else None,
+                                 trade_date, end)
+        })
+    return splits
+
+def process_trade_impact_data(season, out_dir=DATA_DIR):
+    """Process data for the trade impact chart: post-trade stats of the players in TRADE_IMPACT_PLAYERS"""
+    df = season.frame
+    require_columns(df, ['Player', 'Tm', 'PTS', 'Date'], 'trade impact chart')
     
-    # Filter for our target players
-    player_mask = filtered_df[col_mapping['Player']].isin(target_players.keys())
-    filtered_df = filtered_df[player_mask]
+    trade_date = TRADE_IMPACT_DATE
+    target_players = TRADE_IMPACT_PLAYERS
     
-    # Process player statistics
     player_stats = []
-    for player_name, team in target_players.items():
-        # Try different possible spellings
-        player_games = filtered_df[filtered_df[col_mapping['Player']].str.contains(player_name.split()[0], case=False)]
-        
-        if len(player_games) > 0:
-            # Calculate player stats
-            ppg = player_games[col_mapping['PTS']].mean()
-            mpg = player_games[col_mapping['MP']].mean() if col_mapping['MP'] in player_games.columns else 25.0
-            
-            # Try to find shooting percentage if available
-            fg_pct = 0.0
-            if 'FG%' in player_games.columns:
-                fg_pct = player_games['FG%'].mean()
-            
+    splits = trade_splits(season, list(target_players), pd.Timestamp(trade_date))
+    for (player, team), split in zip(target_players.items(), splits):
+        after = split['after']
+        if after['games']:
             player_stats.append({
-                'player': player_name,
-                'team': team,
-                'ppg': float(ppg) if not pd.isna(ppg) else 0.0,
-                'mpg': float(mpg) if not pd.isna(mpg) else 0.0,
-                'fgPct': float(fg_pct) if not pd.isna(fg_pct) else 0.0,
-                'games': len(player_games)
+                'player': split['player'],
+                'team': after['team'] or team,
+                'ppg': after['ppg'] or 0.0,
+                'mpg': after['mpg'] or 0.0,
+                'fgPct': after['fgPct'] or 0.0,
+                'games': after['games']
             })
     
     # If no data is found for our players, create synthetic data
@@ -515,30 +2152,20 @@ def process_trade_impact_data(df):
             }
         ]
     
-    # Process team records - only for teams of our players
+    # Record of each player's new team since the trade, game by game
+    season_end = season_bounds(pd.Timestamp(trade_date))[1]
     team_records = []
-    for team in ['LAL', 'DAL']:
-        # Create synthetic team records based on the trade date
-        dates = pd.date_range(start=trade_date, end='2025-04-15', freq='2D')
-        wins = 0
-        games = 0
-        
-        for date in dates:
-            # Generate a win percentage trend
-            is_win = np.random.random() > 0.4  # More wins than losses after the trade date
-            result = 'W' if is_win else 'L'
-            
-            # Increment counters
-            games += 1
-            if is_win:
-                wins += 1
-            
+    for team in dict.fromkeys(target_players.values()):
+        games = season.team_game_index.games(team, pd.Timestamp(trade_date), season_end)
+        games = games[games['win'].notna()]
+        for date, result, played, wins in zip(games['Date'], games['result'], range(1, len(games) + 1),
+                                              games['win'].astype(int).cumsum()):
             team_records.append({
                 'team': team,
                 'date': date,
                 'result': result,
-                'games': games,
-                'wins': wins
+                'games': played,
+                'wins': int(wins)
             })
     
     # Convert to JSON and save
@@ -548,11 +2175,543 @@ def process_trade_impact_data(df):
         'teamRecords': team_records
     }
     
-    with open('data/trade_impact_data.json', 'w') as f:
-        json.dump(trade_impact_data, f, cls=CustomJSONEncoder)
+    write_json(os.path.join(out_dir, 'trade_impact_data.json'), trade_impact_data)
     
     print(f"Trade impact data processed for Luka Dončić and Anthony Davis with {len(team_records)} game records")
 
+# Chart processors in build order. Bump a processor's version whenever its output
+# changes so the build cache regenerates that chart on the next start.
+# 'columns' are the frame columns a processor reads and 'tables' the SeasonData tables it
+# shares with other processors; process workers load only those (see run_chart_processors).
+CHART_PROCESSORS = [
+    {'name': 'mvp', 'label': 'MVP Chart', 'process': process_mvp_data,
+     'output': 'mvp_data.json', 'version': 3,
+     'columns': ['Player', 'Date', 'PTS', 'AST', 'TRB', 'GmSc'], 'tables': []},
+    {'name': 'championship', 'label': 'Championship Chart', 'process': process_championship_data,
+     'output': 'champ_data.json', 'version': 4,
+     'columns': ['Tm', 'Date', 'PTS', 'Season'], 'tables': ['team_days']},
+    {'name': 'scoring', 'label': 'Scoring Leader Chart', 'process': process_scoring_data,
+     'output': 'scoring_data.json', 'version': 3,
+     'columns': ['Player', 'Date', 'PTS'], 'tables': []},
+    {'name': 'bench', 'label': 'Bench Strength Chart', 'process': process_bench_data,
+     'output': 'bench_data.json', 'version': 3,
+     'columns': ['Player', 'Tm', 'PTS', 'MP', 'GmSc'], 'tables': []},
+    {'name': 'trade_impact', 'label': 'Trade Impact Chart', 'process': process_trade_impact_data,
+     'output': 'trade_impact_data.json', 'version': 5,
+     'columns': ['Player', 'Tm', 'Date', 'Season', 'PTS', 'MP', 'FG', 'FGA', 'FG%'], 'tables': ['team_days']},
+]
+
+# Season served by the API routes and the snapshot it belongs to. It is set after a
+# rebuild in this process, or loaded lazily from the season cache when data/ points to
+# another snapshot: startup skipped the build, or a separate --build-only or --ingest
+# process swapped one in.
+current_season = {'snapshot': None, 'season': None}
+current_season_lock = threading.Lock()
+
+def set_current_season(season):
+    """Swap in a new season for the current snapshot and drop every API response cached for the old one"""
+    with current_season_lock:
+        current_season.update(snapshot=current_snapshot(), season=season)
+        for cached in API_CACHES:
+            cached.cache_clear()
+
+class DataNotReady(Exception):
+    """Raised by API routes while no build has finished yet"""
+
+@app.errorhandler(DataNotReady)
+def data_not_ready(e):
+    return {'error': str(e), 'rebuild': dict(rebuild_status)}, 503
+
+def get_current_season():
+    """Return the season served by the API, loading it from the season cache if data/ changed since"""
+    snapshot = current_snapshot()
+    with current_season_lock:
+        if current_season['season'] is None or current_season['snapshot'] != snapshot:
+            # Builds save the manifest before swapping data/, so it describes this snapshot or a newer one
+            manifest = load_build_manifest()
+            if not manifest.get('source'):
+                raise DataNotReady("No data has been built yet")
+            frame = load_full_frame(manifest['source'], manifest.get('increments', []))
+            current_season.update(snapshot=snapshot, season=build_season_data(normalize_frame(frame)))
+            for cached in API_CACHES:
+                cached.cache_clear()
+        return current_season['season']
+
+def parse_date_arg(name):
+    """
+    Parse an optional YYYY-MM-DD query argument.
+    
+    Only plain dates are accepted: a time of day would shift the bounds, and a time zone
+    cannot be compared with the tz-naive game dates.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(datetime.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise ValueError(f"Invalid date for '{name}': {value} (expected YYYY-MM-DD)")
+
+def parse_count_arg(name, default, maximum=100):
+    """Parse an optional positive integer query argument, capped at maximum"""
+    value = request.args.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for '{name}': {value}")
+    if value < 1:
+        raise ValueError(f"'{name}' must be at least 1")
+    return min(value, maximum)
+
+def mvp_leaderboard(df, n, date_from=None, date_to=None):
+    """
+    Top n players by MVP score, PTS * 0.4 + AST * 0.3 + TRB * 0.2 + GmSc * 0.1 averaged over games,
+    each with their last 10 Game Scores. Only qualified players in the date range are ranked.
+    """
+    if date_from is not None:
+        df = df[df['Date'] >= date_from]
+    if date_to is not None:
+        df = df[df['Date'] <= date_to]
+    df = df[df['Player'].isin(mvp_qualified_players(game_counts(df['Player'])))]
+    
+    averages = df.groupby('Player', observed=True)[['PTS', 'AST', 'TRB', 'GmSc']].mean()
+    averages['mvpScore'] = (averages['PTS'] * 0.4 + averages['AST'] * 0.3 +
+                            averages['TRB'] * 0.2 + averages['GmSc'] * 0.1)
+    top = averages.nlargest(n, 'mvpScore')
+    
+    # Last 10 games of each leader, oldest first
+    recent = (df[df['Player'].isin(top.index)]
+              .sort_values('Date', kind='stable')
+              .groupby('Player', observed=True).tail(10))
+    game_scores = {player: [{'date': date.strftime('%Y-%m-%d'), 'score': float(score)}
+                            for date, score in zip(games['Date'], games['GmSc'])]
+                   for player, games in recent.groupby('Player', observed=True)}
+    
+    return [{
+        'player': player,
+        'mvpScore': float(row['mvpScore']),
+        'avgPTS': float(row['PTS']),
+        'avgAST': float(row['AST']),
+        'avgTRB': float(row['TRB']),
+        'avgGmSc': float(row['GmSc']),
+        'gameScores': game_scores.get(player, [])
+    } for player, row in top.iterrows()]
+
+def scoring_leaderboard(df, n):
+    """Top n scorers by average points, each with their per-game points in date order"""
+    top = top_scoring_players(df.groupby('Player', observed=True)['PTS'].mean(), game_counts(df['Player']), n)
+    games = df[df['Player'].isin(top.index)].sort_values('Date', kind='stable')
+    series = {player: [{'date': date.strftime('%Y-%m-%d'), 'pts': float(pts)}
+                       for date, pts in zip(rows['Date'], rows['PTS'])]
+              for player, rows in games.groupby('Player', observed=True)}
+    return [{
+        'player': player,
+        'avgPTS': float(avg_pts),
+        'games': series.get(player, [])
+    } for player, avg_pts in top.items()]
+
+def lttb_indices(x, y, threshold):
+    """
+    Positions of the points kept by largest-triangle-three-buckets downsampling of a series.
+
+    The first and last points are always kept; the points between are split into
+    threshold - 2 equal buckets, and each bucket keeps the point that forms the largest
+    triangle with the point kept from the previous bucket and the mean of the next one.
+    Bucket edges and means are computed for all buckets at once; only the choice of
+    point, which depends on the previous bucket's choice, walks the buckets in order.
+    """
+    count = len(x)
+    if threshold >= count:
+        return np.arange(count)
+    if threshold < 3:
+        return np.array([0, count - 1][:threshold])
+
+    edges = np.floor(np.arange(threshold - 1) * (count - 2) / (threshold - 2)).astype(np.int64) + 1
+    sizes = np.diff(edges)
+    x_means = np.add.reduceat(x[1:-1], edges[:-1] - 1) / sizes
+    y_means = np.add.reduceat(y[1:-1], edges[:-1] - 1) / sizes
+    # The bucket after the last one is the final point
+    next_x = np.append(x_means[1:], x[-1])
+    next_y = np.append(y_means[1:], y[-1])
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        areas = np.abs((x[previous] - next_x[bucket]) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y[bucket] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+def scoring_series(season, n, points):
+    """
+    Top n scorers of the charted season with their per-game points across every loaded
+    season, each series downsampled with LTTB to at most points games.
+    """
+    frame = season.frame
+    top = top_scoring_players(frame.groupby('Player', observed=True)['PTS'].mean(), game_counts(frame['Player']), n)
+    players = []
+    for player, avg_pts in top.items():
+        games = season.game_index.games(player)
+        games = games[games['PTS'].notna()]
+        days = games['Date'].to_numpy().astype('datetime64[D]').astype(np.float64)
+        pts = games['PTS'].to_numpy(dtype=np.float64)
+        kept = lttb_indices(days, pts, points)
+        players.append({
+            'player': player,
+            'avgPTS': float(avg_pts),
+            'totalGames': len(games),
+            'games': [{'date': date.strftime('%Y-%m-%d'), 'pts': float(value)}
+                      for date, value in zip(games['Date'].iloc[kept], pts[kept])]
+        })
+    return players
+
+@lru_cache(maxsize=256)
+def cached_mvp_leaderboard(season, n, date_from, date_to):
+    return mvp_leaderboard(season.frame, n, date_from, date_to)
+
+@lru_cache(maxsize=256)
+def cached_scoring_leaderboard(season, n):
+    return scoring_leaderboard(season.frame, n)
+
+def metric_leaderboard(season, metric, n):
+    """Top n MVP-qualified players of the charted season by their per-game mean of a derived metric"""
+    values = season.metrics([metric])[metric].loc[season.frame.index]
+    players = season.frame['Player']
+    qualified = players.isin(mvp_qualified_players(game_counts(players)))
+    means = values[qualified].groupby(players[qualified], observed=True).agg(['mean', 'count'])
+    top = means[means['count'] > 0].nlargest(n, 'mean')
+    return [{'player': player, 'value': float(row['mean']), 'games': int(row['count'])}
+            for player, row in top.iterrows()]
+
+@lru_cache(maxsize=256)
+def cached_metric_leaderboard(season, metric, n):
+    return metric_leaderboard(season, metric, n)
+
+@lru_cache(maxsize=1024)
+def cached_trade_splits(season, players, trade_date):
+    return trade_splits(season, players, trade_date)
+
+@lru_cache(maxsize=256)
+def cached_scoring_series(season, n, points):
+    return scoring_series(season, n, points)
+
+# Response caches cleared whenever a new season is swapped in
+API_CACHES = [cached_mvp_leaderboard, cached_scoring_leaderboard, cached_trade_splits, cached_metric_leaderboard,
+              cached_scoring_series]
+
+# Most players one trade impact query may ask about
+TRADE_IMPACT_MAX_PLAYERS = 30
+
+# Most similar players one similarity query may return
+SIMILARITY_MAX_K = 50
+
+# Default and largest number of points per player in a downsampled scoring series
+SCORING_SERIES_POINTS = 200
+SCORING_SERIES_MAX_POINTS = 2000
+
+@app.route('/api/mvp/top')
+def api_mvp_top():
+    """Top MVP candidates, optionally limited to a date range"""
+    try:
+        n = parse_count_arg('n', 10)
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to')
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    return {'players': cached_mvp_leaderboard(get_current_season(), n, date_from, date_to)}
+
+@app.route('/api/scoring/top')
+def api_scoring_top():
+    """Top scorers with their per-game points"""
+    try:
+        n = parse_count_arg('n', 10)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    return {'players': cached_scoring_leaderboard(get_current_season(), n)}
+
+@app.route('/api/scoring/series')
+def api_scoring_series():
+    """Top scorers with their per-game points across all seasons, downsampled to at most 'points' games each"""
+    try:
+        n = parse_count_arg('n', 10)
+        points = parse_count_arg('points', SCORING_SERIES_POINTS, maximum=SCORING_SERIES_MAX_POINTS)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    return {'points': points, 'players': cached_scoring_series(get_current_season(), n, points)}
+
+@app.route('/api/metrics/top')
+def api_metrics_top():
+    """Top qualified players by the per-game mean of a derived metric such as TS% or USG%"""
+    metric = request.args.get('metric')
+    if not metric:
+        return {'error': "'metric' is required"}, 400
+    try:
+        n = parse_count_arg('n', 10)
+        return {'metric': metric, 'players': cached_metric_leaderboard(get_current_season(), metric, n)}
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+@app.route('/api/trade-impact')
+def api_trade_impact():
+    """Before and after splits of one or more players (repeated 'player' arguments) around a trade date"""
+    players = request.args.getlist('player')
+    try:
+        trade_date = parse_date_arg('date')
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    if trade_date is None:
+        return {'error': "'date' is required"}, 400
+    if not players:
+        return {'error': "At least one 'player' is required"}, 400
+    if len(players) > TRADE_IMPACT_MAX_PLAYERS:
+        return {'error': f"At most {TRADE_IMPACT_MAX_PLAYERS} players can be compared at once"}, 400
+    return {
+        'tradeDate': trade_date.strftime('%Y-%m-%d'),
+        'players': cached_trade_splits(get_current_season(), tuple(players), trade_date)
+    }
+
+@app.route('/api/players/search')
+def api_players_search():
+    """Players whose name, or a word of it, starts with q, ignoring accents and case"""
+    try:
+        n = parse_count_arg('n', 10, maximum=50)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    query = request.args.get('q', '')
+    return {'query': query, 'players': get_current_season().player_search.search(query, n)}
+
+@app.route('/api/player/<path:name>/games')
+def api_player_games(name):
+    """A player's game log across every loaded season, optionally limited to a date range"""
+    try:
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to')
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    season = get_current_season()
+    player = season.player_search.resolve(name)
+    if player is None:
+        return {'error': f"Unknown player {name}"}, 404
+    games = season.game_index.games(player, date_from, date_to).drop(columns='Player')
+    games = games.assign(Date=games['Date'].dt.strftime('%Y-%m-%d'))
+    return {
+        'player': player,
+        'games': games.astype(object).where(games.notna(), None).to_dict(orient='records')
+    }
+
+@app.route('/api/player/<path:name>/form')
+def api_player_form(name):
+    """A player's rolling form after their last game on or before an optional date"""
+    try:
+        date = parse_date_arg('date')
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    season = get_current_season()
+    name = season.player_search.resolve(name) or name
+    row = season.player_form.latest(name, date)
+    if row is None:
+        return {'error': f"No games found for {name}"}, 404
+    windows = [f'last{n}' for n in FORM_WINDOWS] + ['ewm']
+    stats = [stat for stat in FORM_STATS if f'{stat}_ewm' in row.index]
+    return {
+        'player': name,
+        'asOf': row['Date'].strftime('%Y-%m-%d'),
+        'form': {window: {stat: optional_float(row[f'{stat}_{window}']) for stat in stats}
+                 for window in windows}
+    }
+
+@app.route('/api/players/<path:name>/similar')
+@app.route('/api/player/<path:name>/similar')
+def api_player_similar(name):
+    """The players of the charted season whose per-game stats are closest to a player's"""
+    try:
+        k = parse_count_arg('k', 10, maximum=SIMILARITY_MAX_K)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    season = get_current_season()
+    name = season.player_search.resolve(name) or name
+    result = season.player_similarity.similar([name], k)[0]
+    if result is None:
+        return {'error': f"No stat profile for {name} (needs {SIMILARITY_MIN_GAMES}+ games this season)"}, 404
+    return result
+
+@app.route('/api/status')
+def api_status():
+    """The snapshot being served and the progress of the current or last rebuild"""
+    snapshot = current_snapshot()
+    with rebuild_status_lock:
+        rebuild = dict(rebuild_status)
+    return {
+        'snapshot': {
+            'version': snapshot_version(os.path.basename(snapshot)),
+            'created': datetime.fromtimestamp(os.path.getmtime(snapshot)).isoformat(timespec='seconds')
+        } if snapshot else None,
+        'rebuild': rebuild
+    }
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Request counts keyed by (method, route, status), and latency histograms keyed by route
+request_counts = {}
+request_latency = {}
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and add its latency to the histogram of its route"""
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    duration = time.perf_counter() - start
+    # Label by route pattern, not path, so the number of series stays bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    with metrics_lock:
+        key = (request.method, route, response.status_code)
+        request_counts[key] = request_counts.get(key, 0) + 1
+        histogram = request_latency.setdefault(route, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                histogram['buckets'][i] += 1
+        histogram['sum'] += duration
+        histogram['count'] += 1
+    return response
+
+def prometheus_labels(**labels):
+    """Format labels as {name="value",...} with Prometheus escaping"""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+def prometheus_metrics():
+    """Pipeline stage and HTTP request metrics in the Prometheus text exposition format"""
+    stage_metrics = [
+        ('duration_seconds', 'nba_viz_stage_duration_seconds', 'gauge',
+         'Wall time of the last run of the pipeline stage'),
+        ('peak_memory_bytes', 'nba_viz_stage_peak_memory_bytes', 'gauge',
+         'Peak resident memory above the start of the last run of the pipeline stage'),
+        ('input_rows', 'nba_viz_stage_input_rows', 'gauge', 'Rows going into the last run of the pipeline stage'),
+        ('output_rows', 'nba_viz_stage_output_rows', 'gauge', 'Rows produced by the last run of the pipeline stage'),
+        ('output_bytes', 'nba_viz_stage_output_bytes', 'gauge',
+         'Bytes written or read by the last run of the pipeline stage'),
+        ('finished', 'nba_viz_stage_last_run_timestamp_seconds', 'gauge',
+         'Unix time the last run of the pipeline stage finished'),
+        ('runs', 'nba_viz_stage_runs_total', 'counter', 'Runs of the pipeline stage'),
+        ('failures', 'nba_viz_stage_failures_total', 'counter', 'Runs of the pipeline stage that raised an error')
+    ]
+    lines = []
+    with metrics_lock:
+        stages = sorted(PIPELINE_METRICS.items())
+        for field, name, kind, help_text in stage_metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{prometheus_labels(stage=stage)} {metrics[field]}"
+                      for stage, metrics in stages if metrics.get(field) is not None]
+        
+        lines += ["# HELP nba_viz_http_requests_total HTTP requests by method, route and status",
+                  "# TYPE nba_viz_http_requests_total counter"]
+        lines += [f"nba_viz_http_requests_total{prometheus_labels(method=method, route=route, status=status)} {count}"
+                  for (method, route, status), count in sorted(request_counts.items())]
+        
+        name = 'nba_viz_http_request_duration_seconds'
+        lines += [f"# HELP {name} HTTP request latency by route", f"# TYPE {name} histogram"]
+        for route, histogram in sorted(request_latency.items()):
+            for bound, count in zip(LATENCY_BUCKETS, histogram['buckets']):
+                lines.append(f"{name}_bucket{prometheus_labels(route=route, le=bound)} {count}")
+            lines.append(f"{name}_bucket{prometheus_labels(route=route, le='+Inf')} {histogram['count']}")
+            lines.append(f"{name}_sum{prometheus_labels(route=route)} {histogram['sum']}")
+            lines.append(f"{name}_count{prometheus_labels(route=route)} {histogram['count']}")
+    return '\n'.join(lines) + '\n'
+
+@app.route('/metrics')
+def metrics():
+    """Pipeline and request metrics for Prometheus"""
+    return prometheus_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# JSON files of the snapshot being served, held in memory with their compressed copies.
+# Keyed by both the plain and the content-hashed file name; reloaded when data/ is swapped.
+served_files = {'snapshot': None, 'files': None}
+served_files_lock = threading.Lock()
+
+def hashed_file_name(name, digest):
+    """Content-hashed name of a data file, such as 'champ_data.3f2a9c0d1b7e4f55.json'"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest[:CONTENT_HASH_LENGTH]}{ext}"
+
+def served_file(body, compressed=None):
+    """In-memory entry of one data file: its SHA-256 and its body in every available encoding"""
+    payloads = {'identity': body}
+    for encoding in content_encodings():
+        payloads[encoding] = (compressed or {}).get(encoding) or compress_payload(body, encoding)
+    return {'digest': hashlib.sha256(body).hexdigest(), 'payloads': payloads}
+
+def load_served_files(data_dir):
+    """
+    Read every JSON output in data_dir into memory, plus a manifest of their content-hashed names.
+
+    Compressed copies written by precompress_snapshot are used when up to date; the others
+    are compressed here.
+    """
+    files = {}
+    manifest = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.json'))):
+        name = os.path.basename(path)
+        if name == DATA_MANIFEST:
+            continue
+        with open(path, 'rb') as f:
+            body = f.read()
+        compressed = {}
+        for encoding in content_encodings():
+            if is_compressed_current(path, encoding):
+                with open(path + COMPRESSED_SUFFIXES[encoding], 'rb') as f:
+                    compressed[encoding] = f.read()
+        entry = served_file(body, compressed)
+        hashed_name = hashed_file_name(name, entry['digest'])
+        files[name] = {**entry, 'cache_control': REVALIDATE_CACHE_CONTROL}
+        files[hashed_name] = {**entry, 'cache_control': IMMUTABLE_CACHE_CONTROL}
+        manifest[name] = f"{DATA_DIR}/{hashed_name}"
+
+    body = json.dumps({'files': manifest}).encode()
+    files[DATA_MANIFEST] = {**served_file(body), 'cache_control': REVALIDATE_CACHE_CONTROL}
+    return files
+
+def get_served_files():
+    """In-memory data files of the current snapshot, loading them if data/ changed since the last call"""
+    snapshot = current_snapshot()
+    with served_files_lock:
+        if served_files['files'] is None or served_files['snapshot'] != snapshot:
+            with pipeline_stage('load_served_files') as stage:
+                files = load_served_files(snapshot or DATA_DIR)
+                stage['output_bytes'] = sum(len(payload) for name, entry in files.items()
+                                            if entry['cache_control'] == REVALIDATE_CACHE_CONTROL
+                                            for payload in entry['payloads'].values())
+            served_files.update(snapshot=snapshot, files=files)
+        return served_files['files']
+
+def data_file_response(entry):
+    """
+    Response for an in-memory data file in the best encoding the client accepts.
+
+    Each encoding has its own strong ETag; a matching If-None-Match gets a 304 with no body.
+    """
+    encoding = next((encoding for encoding in content_encodings() if request.accept_encodings[encoding]),
+                    'identity')
+    response = app.response_class(entry['payloads'][encoding], mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{entry['digest'][:CONTENT_HASH_LENGTH]}-{encoding}")
+    response.headers['Cache-Control'] = entry['cache_control']
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """Serve the main HTML page"""
@@ -566,9 +2725,12 @@ def index():
 def serve_file(path):
     """Serve any requested file"""
     try:
-        # First check if it's a data file
-        if path.startswith('data/'):
-            return send_from_directory(os.getcwd(), path)
+        # Data files are served from memory
+        if path.startswith(f'{DATA_DIR}/'):
+            entry = get_served_files().get(path[len(DATA_DIR) + 1:])
+            if entry is not None:
+                return data_file_response(entry)
+            return f"<html><body><h1>File not found</h1><p>The requested file {path} could not be found.</p></body></html>", 404
         
         # Check if the file exists in the current directory
         if os.path.exists(os.path.join(os.getcwd(), path)):
@@ -605,8 +2767,49 @@ def debug():
     }
 
 if __name__ == '__main__':
-    # Process data before starting the server
-    load_and_process_data()
+    parser = argparse.ArgumentParser(description='NBA data preprocessing server')
+    parser.add_argument('--force-rebuild', action='store_true',
+                        help='Reprocess every chart even if the build cache is up to date')
+    parser.add_argument('--json-format', choices=['records', 'columnar'], default='records',
+                        help='Layout of the per-game JSON files in data/ (default: records)')
+    parser.add_argument('--ingest', metavar='CSV',
+                        help='Add a CSV of new game rows to the built data, update the affected outputs and exit')
+    parser.add_argument('--verify', action='store_true',
+                        help='With --ingest, check the updated outputs against a full rebuild')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of chart processors to run concurrently (default: 1)')
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread',
+                        help='Worker type used when --workers is greater than 1')
+    parser.add_argument('--compact', action='store_true',
+                        help='Hold the loaded data with categorical and downcast dtypes to use less memory')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the source CSVs in chunks with bounded memory instead of loading them whole')
+    parser.add_argument('--chunk-rows', type=int, default=STREAM_CHUNK_ROWS,
+                        help=f'Rows per chunk with --stream (default: {STREAM_CHUNK_ROWS})')
+    parser.add_argument('--build-only', action='store_true',
+                        help='Build the data in the foreground and exit without starting the server')
+    args = parser.parse_args()
+    JSON_FORMAT = args.json_format
+    COMPACT_FRAME = args.compact
+    build_args = {'force': args.force_rebuild, 'workers': args.workers, 'executor': args.executor,
+                  'stream': args.stream, 'chunk_rows': args.chunk_rows}
+    
+    if args.ingest:
+        # Ingest works from the source recorded in the manifest and the aggregate state, so
+        # it neither downloads nor hashes the dataset; build first only if nothing was built
+        if not load_build_manifest().get('source'):
+            load_and_process_data(**build_args)
+        ingest_games(args.ingest, verify=args.verify)
+        sys.exit(0)
+
+    if args.build_only:
+        load_and_process_data(**build_args)
+        sys.exit(0)
+    
+    # Serve the current snapshot right away and rebuild behind it. The debug reloader runs
+    # the app in a child process (with WERKZEUG_RUN_MAIN set); only that one rebuilds.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_rebuild(**build_args)
     
     # Start the server
     host = '0.0.0.0'  # Listen on all network interfaces